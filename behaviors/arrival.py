@@ -1,3 +1,8 @@
+import numpy as np
+
+from behaviors import batch
+
+
 class Arrival:
     def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
         direction = target_pos - agent_pos
@@ -8,9 +13,26 @@ class Arrival:
         else:
             desired_speed = max_speed
             
-        desired_velocity = direction.normalized() * desired_speed
-        steering = desired_velocity - agent_vel
-        
-        if steering.length() > max_force:
-            steering = steering.normalized() * max_force
-        return steering
\ No newline at end of file
+        # Reuse direction as the desired velocity, then as the steering force
+        steering = direction.normalize_ip()
+        steering *= desired_speed
+        steering -= agent_vel
+        return steering.clamp_length_ip(max_force)
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force):
+        """Arrival for N agents at once. Arrays are (N, 2), limits scalar or (N,)."""
+        positions = batch.as_array(positions)
+        velocities = batch.as_array(velocities)
+        targets = batch.as_array(targets)
+        count = len(positions)
+        max_speed = batch.as_limits(max_speed, count)
+        max_force = batch.as_limits(max_force, count)
+
+        direction = targets - positions
+        distance = batch.lengths(direction)
+        # Same 100 unit slowing radius as the scalar version
+        desired_speed = np.where(distance < 100, max_speed * (distance / 100), max_speed)
+
+        desired_velocity = batch.normalized(direction) * desired_speed[:, None]
+        steering = desired_velocity - velocities
+        return batch.truncate(steering, max_force)
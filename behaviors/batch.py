@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def as_array(points):
+    """Return an (N, 2) float array for a batch of positions or velocities."""
+    return np.asarray(points, dtype=float).reshape(-1, 2)
+
+
+def as_limits(value, count):
+    """Broadcast a scalar or per-agent limit to an (N,) float array."""
+    return np.broadcast_to(np.asarray(value, dtype=float), (count,))
+
+
+def lengths(vectors):
+    """Row-wise Vector2D.length(), using the same arithmetic as the scalar code."""
+    return np.sqrt(vectors[:, 0] * vectors[:, 0] + vectors[:, 1] * vectors[:, 1])
+
+
+def normalized(vectors):
+    """Row-wise version of Vector2D.normalized(); zero rows stay zero."""
+    length = lengths(vectors)
+    safe = np.where(length != 0, length, 1.0)
+    result = vectors / safe[:, None]
+    result[length == 0] = 0.0
+    return result
+
+
+def truncate(vectors, max_length):
+    """Scale down rows longer than max_length, like Vector2D.clamp_length_ip."""
+    length_sq = vectors[:, 0] * vectors[:, 0] + vectors[:, 1] * vectors[:, 1]
+    too_long = length_sq > max_length * max_length
+    if too_long.any():
+        vectors = vectors.copy()
+        length = np.sqrt(length_sq[too_long])
+        vectors[too_long] = vectors[too_long] / length[:, None] * max_length[too_long, None]
+    return vectors
@@ -1,6 +1,8 @@
 from behaviors.seek import Seek
 from vector import Vector2D
 
+SEEK = Seek()
+
 
 class Circuit:
     def __init__(self):
@@ -14,8 +16,8 @@ class Circuit:
     
     def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
         target = self.waypoints[self.current_waypoint]
-        if agent_pos.distance_to(target) < 5:
+        if agent_pos.distance_squared_to(target) < 25:
             self.current_waypoint = (self.current_waypoint + 1) % len(self.waypoints)
             target = self.waypoints[self.current_waypoint]
         
-        return Seek().calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
\ No newline at end of file
+        return SEEK.calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
\ No newline at end of file
@@ -1,8 +1,18 @@
 from behaviors.flee import Flee
+from behaviors import batch
+
+FLEE = Flee()
 
 
 class Evade:
     def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
         prediction = 1.0
-        future_pos = target_pos + target_vel * prediction
-        return Flee().calculate(agent_pos, agent_vel, future_pos, target_vel, max_speed, max_force)
\ No newline at end of file
+        future_pos = target_vel * prediction
+        future_pos += target_pos
+        return FLEE.calculate(agent_pos, agent_vel, future_pos, target_vel, max_speed, max_force)
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force):
+        """Evade for N agents at once. Arrays are (N, 2), limits scalar or (N,)."""
+        prediction = 1.0
+        future_pos = batch.as_array(targets) + batch.as_array(target_vels) * prediction
+        return FLEE.calculate_batch(positions, velocities, future_pos, target_vels, max_speed, max_force)
@@ -2,6 +2,9 @@ from behaviors.arrival import Arrival
 from behaviors.seek import Seek
 from vector import Vector2D
 
+SEEK = Seek()
+ARRIVAL = Arrival()
+
 class OneWay:
     def __init__(self):
         self.reset()
@@ -19,14 +22,14 @@ class OneWay:
         if self.finished:
             # Arrival when finished to maintain position
             target = self.waypoints[-1]
-            return Arrival().calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
+            return ARRIVAL.calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
             
         target = self.waypoints[self.current_waypoint]
-        if agent_pos.distance_to(target) < 5:
+        if agent_pos.distance_squared_to(target) < 25:
             if self.current_waypoint < len(self.waypoints) - 1:
                 self.current_waypoint += 1
             else:
                 self.finished = True
             target = self.waypoints[self.current_waypoint]
         
-        return Seek().calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
\ No newline at end of file
+        return SEEK.calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import numpy as np
+
+from vector import Vector2D
+from behaviors import batch
+
+
+class BehaviorPipeline:
+    """Base for behaviors built from (behavior, weight) entries.
+
+    A pipeline has the same calculate / calculate_batch interface as a
+    single behavior, so pipelines can be nested and dropped in wherever a
+    behavior is expected. Entries are shared, not copied; stateless
+    behaviors (Seek, Flee, Arrival, ...) can be reused by any number of
+    pipelines.
+    """
+
+    def __init__(self, *entries):
+        self.entries = [self._entry(entry) for entry in entries]
+
+    @staticmethod
+    def _entry(entry):
+        if isinstance(entry, tuple):
+            behavior, weight = entry
+            return behavior, float(weight)
+        return entry, 1.0
+
+    def add(self, behavior, weight=1.0):
+        self.entries.append((behavior, float(weight)))
+        return self
+
+    def reset(self):
+        for behavior, _ in self.entries:
+            if hasattr(behavior, 'reset'):
+                behavior.reset()
+
+    @staticmethod
+    def forces_batch(behavior, positions, velocities, targets, target_vels, max_speed, max_force):
+        """(N, 2) forces of one entry; behaviors without calculate_batch are run row by row."""
+        if hasattr(behavior, 'calculate_batch'):
+            return behavior.calculate_batch(positions, velocities, targets, target_vels, max_speed, max_force)
+        forces = np.zeros((len(positions), 2))
+        for row in range(len(positions)):
+            force = behavior.calculate(
+                Vector2D(*positions[row]), Vector2D(*velocities[row]),
+                Vector2D(*targets[row]), Vector2D(*target_vels[row]),
+                float(max_speed[row]), float(max_force[row])
+            )
+            forces[row] = (force.x, force.y)
+        return forces
+
+
+class WeightedSum(BehaviorPipeline):
+    """Blend every entry: the sum of weight * force, truncated to max_force."""
+
+    def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
+        total = Vector2D(0, 0)
+        for behavior, weight in self.entries:
+            force = behavior.calculate(agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force)
+            force *= weight
+            total += force
+        return total.clamp_length_ip(max_force)
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force):
+        """Weighted sum for N agents at once. Arrays are (N, 2), limits scalar or (N,)."""
+        positions = batch.as_array(positions)
+        velocities = batch.as_array(velocities)
+        targets = batch.as_array(targets)
+        target_vels = batch.as_array(target_vels)
+        count = len(positions)
+        max_speed = batch.as_limits(max_speed, count)
+        max_force = batch.as_limits(max_force, count)
+
+        total = np.zeros((count, 2))
+        for behavior, weight in self.entries:
+            total += weight * self.forces_batch(behavior, positions, velocities, targets, target_vels, max_speed, max_force)
+        return batch.truncate(total, max_force)
+
+
+class Prioritized(BehaviorPipeline):
+    """Prioritized truncated running sum.
+
+    Entries are taken in order and their weighted forces added until the
+    max_force budget is spent; the entry that overflows the budget
+    contributes only what is left, and later entries get nothing. Put the
+    behaviors that must win (avoidance, separation) first.
+    """
+
+    def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
+        total = Vector2D(0, 0)
+        for behavior, weight in self.entries:
+            remaining = max_force - total.length()
+            if remaining <= 0:
+                break
+            force = behavior.calculate(agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force)
+            force *= weight
+            if force.length_squared() > remaining * remaining:
+                force.normalize_ip()
+                force *= remaining
+            total += force
+        return total
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force):
+        """Prioritized sum for N agents at once. Arrays are (N, 2), limits scalar or (N,)."""
+        positions = batch.as_array(positions)
+        velocities = batch.as_array(velocities)
+        targets = batch.as_array(targets)
+        target_vels = batch.as_array(target_vels)
+        count = len(positions)
+        max_speed = batch.as_limits(max_speed, count)
+        max_force = batch.as_limits(max_force, count)
+
+        total = np.zeros((count, 2))
+        for behavior, weight in self.entries:
+            remaining = np.maximum(max_force - batch.lengths(total), 0.0)
+            if not remaining.any():
+                break
+            force = weight * self.forces_batch(behavior, positions, velocities, targets, target_vels, max_speed, max_force)
+            total += batch.truncate(force, remaining)
+        return total
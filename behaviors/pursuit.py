@@ -1,8 +1,18 @@
 from behaviors.seek import Seek
+from behaviors import batch
+
+SEEK = Seek()
 
 
 class Pursuit:
     def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
         prediction = 1.0
-        future_pos = target_pos + target_vel * prediction
-        return Seek().calculate(agent_pos, agent_vel, future_pos, target_vel, max_speed, max_force)
\ No newline at end of file
+        future_pos = target_vel * prediction
+        future_pos += target_pos
+        return SEEK.calculate(agent_pos, agent_vel, future_pos, target_vel, max_speed, max_force)
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force):
+        """Pursuit for N agents at once. Arrays are (N, 2), limits scalar or (N,)."""
+        prediction = 1.0
+        future_pos = batch.as_array(targets) + batch.as_array(target_vels) * prediction
+        return SEEK.calculate_batch(positions, velocities, future_pos, target_vels, max_speed, max_force)
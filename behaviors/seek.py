@@ -1,9 +1,23 @@
-from vector import Vector2D
+from behaviors import batch
 
 class Seek:
     def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
-        desired_velocity = (target_pos - agent_pos).normalized() * max_speed
-        steering = desired_velocity - agent_vel
-        if steering.length() > max_force:
-            steering = steering.normalized() * max_force
-        return steering
\ No newline at end of file
+        # One allocation: build the desired velocity and turn it into the steering in place
+        steering = target_pos - agent_pos
+        steering.normalize_ip()
+        steering *= max_speed
+        steering -= agent_vel
+        return steering.clamp_length_ip(max_force)
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force):
+        """Seek for N agents at once. Arrays are (N, 2), limits scalar or (N,)."""
+        positions = batch.as_array(positions)
+        velocities = batch.as_array(velocities)
+        targets = batch.as_array(targets)
+        count = len(positions)
+        max_speed = batch.as_limits(max_speed, count)
+        max_force = batch.as_limits(max_force, count)
+
+        desired_velocity = batch.normalized(targets - positions) * max_speed[:, None]
+        steering = desired_velocity - velocities
+        return batch.truncate(steering, max_force)
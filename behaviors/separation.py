@@ -0,0 +1,65 @@
+import numpy as np
+
+from vector import Vector2D
+from behaviors import batch
+
+
+class Separation:
+    """Push away from nearby agents, harder the closer they are.
+
+    The scalar version steers away from the positions in `neighbors`, which
+    the caller fills in. The batch version separates the agents of the
+    batch from each other, comparing every pair in blocks of rows, so a
+    crowd running a pipeline spreads out without any extra setup. Pass
+    others=[...] to calculate_batch to steer away from a fixed set instead;
+    others=neighbors matches calculate agent by agent.
+    """
+
+    def __init__(self, radius=30, neighbors=None):
+        self.radius = radius
+        self.neighbors = neighbors or []
+
+    def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
+        push = Vector2D(0, 0)
+        radius_sq = self.radius * self.radius
+        for other in self.neighbors:
+            away = agent_pos - other
+            distance_sq = away.length_squared()
+            if 0 < distance_sq < radius_sq:
+                # 1/distance falloff: the normalized direction divided by the distance
+                away *= 1.0 / distance_sq
+                push += away
+        if push.length_squared() == 0:
+            return push
+        push.normalize_ip()
+        push *= max_speed
+        push -= agent_vel
+        return push.clamp_length_ip(max_force)
+
+    def calculate_batch(self, positions, velocities, targets, target_vels, max_speed, max_force,
+                        block=1024, others=None):
+        """Separation of N agents from `others` ((M, 2), default the batch itself). Arrays are (N, 2), limits scalar or (N,)."""
+        positions = batch.as_array(positions)
+        velocities = batch.as_array(velocities)
+        count = len(positions)
+        max_speed = batch.as_limits(max_speed, count)
+        max_force = batch.as_limits(max_force, count)
+        if others is None:
+            others = positions
+        else:
+            # neighbors holds Vector2D objects; (x, y) pairs and arrays pass through
+            others = batch.as_array([(other.x, other.y) if isinstance(other, Vector2D) else other for other in others])
+
+        push = np.zeros((count, 2))
+        radius_sq = self.radius * self.radius
+        for start in range(0, count, block):
+            away = positions[start:start + block, None, :] - others[None, :, :]
+            distance_sq = away[:, :, 0] * away[:, :, 0] + away[:, :, 1] * away[:, :, 1]
+            close = (distance_sq > 0) & (distance_sq < radius_sq)
+            weight = np.divide(1.0, distance_sq, out=np.zeros_like(distance_sq), where=close)
+            push[start:start + block] = (away * weight[:, :, None]).sum(axis=1)
+
+        pushing = (push[:, 0] != 0) | (push[:, 1] != 0)
+        steering = batch.normalized(push) * max_speed[:, None] - velocities
+        steering[~pushing] = 0.0
+        return batch.truncate(steering, max_force)
@@ -2,6 +2,9 @@ from behaviors.arrival import Arrival
 from behaviors.seek import Seek
 from vector import Vector2D
 
+SEEK = Seek()
+ARRIVAL = Arrival()
+
 
 class TwoWay:
     def __init__(self):
@@ -15,9 +18,9 @@ class TwoWay:
 
     def calculate(self, agent_pos, agent_vel, target_pos, target_vel, max_speed, max_force):
         target = self.waypoints[self.current_waypoint]
-        distance_to_target = agent_pos.distance_to(target)
+        distance_sq = agent_pos.distance_squared_to(target)
 
-        if distance_to_target < 5:
+        if distance_sq < 25:
             if self.direction == 1 and self.current_waypoint == len(self.waypoints) - 1:
                 self.direction = -1
             elif self.direction == -1 and self.current_waypoint == 0:
@@ -25,10 +28,9 @@ class TwoWay:
             else:
                 self.current_waypoint += self.direction
             target = self.waypoints[self.current_waypoint]
-            distance_to_target = agent_pos.distance_to(target) # update distance
 
         # Combine waypoint check and distance check for Seek behavior
         if self.current_waypoint == 1:
-            return Seek().calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
+            return SEEK.calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
         else:
-            return Arrival().calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
\ No newline at end of file
+            return ARRIVAL.calculate(agent_pos, agent_vel, target, target_vel, max_speed, max_force)
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""Run the benchmark suite: python -m benchmarks [--quick] [--out results.json] [--compare old.json]"""
+import argparse
+import json
+import sys
+
+from benchmarks.suite import SECTIONS, compare, run_suite
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Steering/pathfinding/simulation benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes and shorter timings")
+    parser.add_argument("--only", choices=SECTIONS, action="append", help="run only this section (repeatable)")
+    parser.add_argument("--out", help="write the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against an earlier JSON result file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_suite(quick=args.quick, sections=args.only or SECTIONS)
+    for entry in report["results"]:
+        print(f"{entry['name']:<55} {entry['value']:>14.2f} {entry['unit']}")
+
+    if args.out:
+        with open(args.out, "w") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+        regressions = 0
+        print(f"\nCompared with {args.compare} (commit {baseline['metadata'].get('git_commit')})")
+        for name, before, after, change, regressed in compare(report, baseline, args.threshold):
+            regressions += regressed
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:<55} {before:>12.2f} -> {after:>12.2f} {change:+7.1%}{flag}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+import datetime
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from behaviors.seek import Seek
+from behaviors.flee import Flee
+from behaviors.pursuit import Pursuit
+from behaviors.evade import Evade
+from behaviors.arrival import Arrival
+from behaviors.circuit import Circuit
+from behaviors.oneway import OneWay
+from behaviors.twoway import TwoWay
+from pathfinding.graph import WaypointGraph
+from simulation.citygen import generate_city, load_city
+from simulation.engine import Engine
+from simulation.rescue_world import RescueWorld
+from vector import Vector2D
+
+BEHAVIOR_CLASSES = [Seek, Flee, Pursuit, Evade, Arrival, Circuit, OneWay, TwoWay]
+BATCH_CLASSES = [Seek, Flee, Pursuit, Evade, Arrival]
+SECTIONS = ("behaviors", "pathfinding", "ticks", "city")
+
+
+def result(name, value, unit, higher_is_better=True):
+    return {"name": name, "value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def time_call(func, min_time=0.2, repeat=3):
+    """Best seconds per call of func() over `repeat` runs of at least min_time each."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def machine_metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+    }
+
+
+def bench_behaviors(quick=False):
+    "Scalar calculate() calls/sec for every behavior, plus agents/sec for calculate_batch."
+    min_time = 0.05 if quick else 0.2
+    results = []
+    agent_pos, agent_vel = Vector2D(400, 300), Vector2D(1, -1)
+    target_pos, target_vel = Vector2D(620, 180), Vector2D(-2, 1)
+    for cls in BEHAVIOR_CLASSES:
+        behavior = cls()
+        seconds = time_call(
+            lambda: behavior.calculate(agent_pos, agent_vel, target_pos, target_vel, 8.0, 0.2),
+            min_time=min_time,
+        )
+        results.append(result(f"behavior.{cls.__name__}.calculate", 1.0 / seconds, "calls/s"))
+
+    rng = np.random.default_rng(0)
+    for count in ((1000,) if quick else (1000, 10000)):
+        positions = rng.uniform(0, 800, (count, 2))
+        velocities = rng.uniform(-3, 3, (count, 2))
+        targets = rng.uniform(0, 800, (count, 2))
+        target_vels = rng.uniform(-3, 3, (count, 2))
+        for cls in BATCH_CLASSES:
+            behavior = cls()
+            seconds = time_call(
+                lambda: behavior.calculate_batch(positions, velocities, targets, target_vels, 8.0, 0.2),
+                min_time=min_time,
+            )
+            results.append(result(f"behavior.{cls.__name__}.calculate_batch[{count}]", count / seconds, "agents/s"))
+    return results
+
+
+def grid_street_graph(cols, rows, spacing=150, origin=50):
+    "Waypoints and adjacency for a cols x rows street grid (4-neighbour intersections)."
+    waypoints = [Vector2D(origin + c * spacing, origin + r * spacing) for r in range(rows) for c in range(cols)]
+    graph = {}
+    for r in range(rows):
+        for c in range(cols):
+            neighbors = []
+            for dc, dr in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                nc, nr = c + dc, r + dr
+                if 0 <= nc < cols and 0 <= nr < rows:
+                    neighbors.append(waypoints[nr * cols + nc])
+            graph[waypoints[r * cols + c]] = neighbors
+    return waypoints, graph
+
+
+def bench_pathfinding(quick=False):
+    """bfs_find_path latency on the built-in graph and enlarged street grids.
+
+    'cold' clears the path cache before every query, 'warm' replays the same
+    queries against a filled cache.
+    """
+    min_time = 0.05 if quick else 0.2
+    sizes = [None, (10, 10)] if quick else [None, (10, 10), (20, 20), (40, 30)]
+    results = []
+    for size in sizes:
+        world = RescueWorld(0, seed=0)
+        if size is None:
+            label = f"builtin[{len(world.waypoints)}]"
+        else:
+            waypoints, graph = grid_street_graph(*size)
+            start = time.perf_counter()
+            world.set_graph(WaypointGraph.from_adjacency(waypoints, graph))
+            label = f"grid{size[0]}x{size[1]}[{len(waypoints)}]"
+            results.append(result(f"pathfinding.{label}.set_graph", (time.perf_counter() - start) * 1e3, "ms", False))
+
+        xs = [w.x for w in world.waypoints]
+        ys = [w.y for w in world.waypoints]
+        rng = random.Random(1)
+        queries = [
+            (Vector2D(rng.uniform(min(xs), max(xs)), rng.uniform(min(ys), max(ys))),
+             Vector2D(rng.uniform(min(xs), max(xs)), rng.uniform(min(ys), max(ys))))
+            for _ in range(64)
+        ]
+
+        for planner in RescueWorld.PLANNERS:
+            world.set_planner(planner)
+
+            def cold():
+                for start_pos, end_pos in queries:
+                    world.path_cache.clear()
+                    world.bfs_find_path(start_pos, end_pos)
+
+            def warm():
+                for start_pos, end_pos in queries:
+                    world.bfs_find_path(start_pos, end_pos)
+
+            cold_seconds = time_call(cold, min_time=min_time) / len(queries)
+            warm()
+            warm_seconds = time_call(warm, min_time=min_time) / len(queries)
+            results.append(result(f"pathfinding.{label}.{planner}.cold", cold_seconds * 1e6, "us", False))
+            results.append(result(f"pathfinding.{label}.{planner}.warm", warm_seconds * 1e6, "us", False))
+    return results
+
+
+def bench_ticks(quick=False):
+    "Full headless RescueWorld ticks/sec at increasing victim and NPC counts."
+    scenarios = [(8, 1), (50, 5)] if quick else [(8, 1), (50, 5), (150, 20), (150, 60)]
+    ticks = 300 if quick else 2000
+    results = []
+    for victims, npcs in scenarios:
+        world = RescueWorld(victims, npc_count=npcs, seed=0)
+        engine = Engine(world)
+        start = time.perf_counter()
+        engine.step(ticks)
+        elapsed = time.perf_counter() - start
+        results.append(result(f"ticks.victims{victims}.npcs{npcs}", ticks / elapsed, "ticks/s"))
+    return results
+
+
+def bench_city(quick=False):
+    """Generated cities: generation, cached load, world setup, route latency and ticks/sec on the result."""
+    sizes = [(30, 30)] if quick else [(30, 30), (100, 100)]
+    ticks = 100 if quick else 500
+    results = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for cols, rows in sizes:
+            options = dict(jitter=0.3, park_ratio=0.1, seed=0)
+            start = time.perf_counter()
+            city = generate_city(cols, rows, **options)
+            generate_ms = (time.perf_counter() - start) * 1e3
+            label = f"city.{cols}x{rows}[{len(city.nodes)}]"
+            results.append(result(f"{label}.generate", generate_ms, "ms", False))
+
+            load_city(cols, rows, cache_dir=cache_dir, **options)
+            start = time.perf_counter()
+            city = load_city(cols, rows, cache_dir=cache_dir, **options)
+            results.append(result(f"{label}.load_cached", (time.perf_counter() - start) * 1e3, "ms", False))
+
+            start = time.perf_counter()
+            world = RescueWorld(100, npc_count=10, seed=0, city=city)
+            results.append(result(f"{label}.world_setup", (time.perf_counter() - start) * 1e3, "ms", False))
+
+            # Node-to-node routes across the city: flat A* against HPA* (with its cluster searches kept)
+            rng = random.Random(1)
+            pairs = [(rng.randrange(len(world.graph)), rng.randrange(len(world.graph))) for _ in range(20)]
+            for name, planner in (("astar", world.astar), ("hpa", world.hpa)):
+                def route():
+                    for start_node, end_node in pairs:
+                        planner.path_ids(start_node, end_node)
+                route()
+                seconds = time_call(route, min_time=0.05 if quick else 0.2) / len(pairs)
+                results.append(result(f"{label}.route.{name}", seconds * 1e3, "ms", False))
+
+            start = time.perf_counter()
+            Engine(world).step(ticks)
+            results.append(result(f"{label}.ticks", ticks / (time.perf_counter() - start), "ticks/s"))
+    return results
+
+
+def run_suite(quick=False, sections=SECTIONS):
+    runners = {"behaviors": bench_behaviors, "pathfinding": bench_pathfinding, "ticks": bench_ticks, "city": bench_city}
+    results = []
+    for section in sections:
+        results.extend(runners[section](quick))
+    return {"metadata": machine_metadata(), "quick": quick, "results": results}
+
+
+def compare(current, baseline, threshold=0.10):
+    """Pair up results by name; returns (name, old, new, change, regressed) rows.
+
+    `change` is the relative improvement (positive is better whichever way
+    the metric points); a drop below -threshold counts as a regression.
+    """
+    old = {entry["name"]: entry for entry in baseline["results"]}
+    rows = []
+    for entry in current["results"]:
+        before = old.get(entry["name"])
+        if before is None or not before["value"]:
+            continue
+        ratio = entry["value"] / before["value"]
+        change = ratio - 1 if entry["higher_is_better"] else 1 / ratio - 1
+        rows.append((entry["name"], before["value"], entry["value"], change, change < -threshold))
+    return rows
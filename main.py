@@ -2,17 +2,16 @@
 import tkinter as tk
 from tkinter import ttk
 import math
-from behaviors.seek import Seek
-from behaviors.flee import Flee
-from behaviors.pursuit import Pursuit
-from behaviors.evade import Evade
-from behaviors.arrival import Arrival
-from behaviors.circuit import Circuit
-from behaviors.oneway import OneWay
-from behaviors.twoway import TwoWay
+from simulation.steering_world import SteeringWorld
+from simulation.engine import FixedStepClock, lerp
+from simulation.profiler import FrameProfiler
 from vector import Vector2D
 
 class SteeringGame:
+    # One simulation tick per 16 ms of real time at 1x, whatever the frame rate
+    TICK_SECONDS = 0.016
+    FRAME_MS = 16
+
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Steering Behaviors")
@@ -46,17 +45,18 @@ class SteeringGame:
         
         # Create behavior buttons
         self.behaviors = ['Seek', 'Flee', 'Pursuit', 'Evade', 'Arrival', 'Circuit', 'One Way', 'Two Ways']
-        self.current_behavior = None
         self.create_behavior_buttons()
         
-        # Initialize agents
-        self.agent_pos = Vector2D(400, 300)
-        self.agent_vel = Vector2D(0, 0)
-        self.target_pos = Vector2D(600, 300)
-        self.target_vel = Vector2D(0, 0)
+        # Fast-forward: 1x, 10x or 100x simulation ticks per real tick
+        self.speed_button = ttk.Button(self.control_panel, text="Speed: 1x", command=self.cycle_speed)
+        self.speed_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Agents, behaviors and physics live in the headless world
+        self.world = SteeringWorld(width=800, height=600)
         
-        # Initialize behavior instances
-        self.behavior_instances = {}
+        # Fixed simulation ticks, drawn interpolated between the last two
+        self.clock = FixedStepClock(self.TICK_SECONDS)
+        self.previous_pos = None
         
         # Draw initial state
         self.draw_agent()
@@ -67,6 +67,14 @@ class SteeringGame:
         self.canvas.bind('<Button-1>', self.on_click)
         self.canvas.bind('<B1-Motion>', self.on_drag)
         
+        # Frame profiler, off until F3; F4 exports what it has collected
+        self.profiler = None
+        self.profile_overlay = self.canvas.create_text(
+            8, 8, anchor=tk.NW, text="", fill='black', font=("Courier", 9), state='hidden', tags="overlay"
+        )
+        self.root.bind("<F3>", self.toggle_profiler)
+        self.root.bind("<F4>", self.export_profile)
+        
         # Animation
         self.is_running = True
         self.update()
@@ -86,25 +94,25 @@ class SteeringGame:
             btn.pack(side=tk.LEFT, padx=5)
     
     def set_behavior(self, behavior):
-        self.current_behavior = behavior
-        # Reset agent velocity when changing behaviors
-        self.agent_vel = Vector2D(0, 0)
-        # Reset the behavior instance if it exists
-        if behavior in self.behavior_instances:
-            if hasattr(self.behavior_instances[behavior], 'reset'):
-                self.behavior_instances[behavior].reset()
+        self.world.set_behavior(behavior)
         # Update title
         self.root.title(f"Steering Behaviors - Current Mode: {behavior}")
         self.draw_waypoints()
 
     
-    def draw_agent(self):
+    def cycle_speed(self):
+        speed = self.clock.cycle_speed()
+        self.speed_button.config(text=f"Speed: {speed}x")
+
+    def draw_agent(self, alpha=1.0):
         self.canvas.delete("agent")
-        x, y = self.agent_pos.x, self.agent_pos.y
+        agent_pos = lerp(self.previous_pos, self.world.agent_pos, alpha)
+        agent_vel = self.world.agent_vel
+        x, y = agent_pos.x, agent_pos.y
         
         # Calculate angle based on velocity
-        if self.agent_vel.length() > 0.1:
-            angle = math.atan2(self.agent_vel.y, self.agent_vel.x)
+        if agent_vel.length() > 0.1:
+            angle = math.atan2(agent_vel.y, agent_vel.x)
         else:
             # Use previous angle or default if no velocity
             angle = 0
@@ -120,7 +128,7 @@ class SteeringGame:
     
     def draw_target(self):
         self.canvas.delete("target")
-        x, y = self.target_pos.x, self.target_pos.y
+        x, y = self.world.target_pos.x, self.world.target_pos.y
         size = 10
         self.canvas.create_oval(x-size, y-size, x+size, y+size, 
                               outline='black', width=2, tags="target")
@@ -130,78 +138,82 @@ class SteeringGame:
                               fill='black', width=2, tags="target")
     
     def on_click(self, event):
-        self.target_pos = Vector2D(event.x, event.y)
+        self.world.target_pos = Vector2D(event.x, event.y)
         self.draw_target()
     
     def on_drag(self, event):
-        self.target_pos = Vector2D(event.x, event.y)
+        self.world.target_pos = Vector2D(event.x, event.y)
         self.draw_target()
     
-    def get_behavior_instance(self, behavior_name):
-        if behavior_name not in self.behavior_instances:
-            # Handle special case for "Two Ways"
-            if behavior_name == "Two Ways":
-                behavior_class = TwoWay
-            else:
-                behavior_class = globals()[behavior_name.replace(" ", "")]
-            self.behavior_instances[behavior_name] = behavior_class()
-        return self.behavior_instances[behavior_name]
-    
+    def toggle_profiler(self, event=None):
+        "Start or stop profiling the update loop and show or hide the overlay."
+        if self.profiler is None:
+            self.profiler = FrameProfiler().attach(self.world)
+            self.canvas.itemconfigure(self.profile_overlay, state='normal')
+            self.canvas.tag_raise("overlay")
+        else:
+            self.profiler.detach()
+            self.profiler = None
+            self.canvas.itemconfigure(self.profile_overlay, state='hidden')
+
+    def export_profile(self, event=None):
+        if self.profiler is not None:
+            self.profiler.export_json("profile.json")
+            self.profiler.export_csv("profile.csv")
+            self.root.title("Steering Behaviors - profile written to profile.json and profile.csv")
+
+    def advance(self):
+        "Run the ticks due since the last frame; returns how many ran."
+        steps = self.clock.advance()
+        if not self.world.current_behavior:
+            return 0
+        # Get max speed and force from sliders
+        self.world.max_speed = self.speed_slider.get() * 0.2  # Reduced multiplier
+        self.world.max_force = self.force_slider.get() * 0.1  # Reduced multiplier
+        for i in range(steps):
+            if i == steps - 1:
+                self.previous_pos = self.world.agent_pos
+            self.world.step()
+        return steps
+
     def update(self):
-        if self.current_behavior:
-            # Get behavior instance
-            behavior = self.get_behavior_instance(self.current_behavior)
-            
-            # Get max speed and force from sliders
-            max_speed = self.speed_slider.get() * 0.2  # Reduced multiplier
-            max_force = self.force_slider.get() * 0.1  # Reduced multiplier
-            
-            # Calculate steering force
-            steering = behavior.calculate(
-                self.agent_pos, self.agent_vel,
-                self.target_pos, self.target_vel,
-                max_speed, max_force
-            )
-            
-            # Update velocity with steering force
-            self.agent_vel += steering
-            
-            # Limit velocity to max speed
-            speed = self.agent_vel.length()
-            if speed > max_speed:
-                self.agent_vel = self.agent_vel.normalized() * max_speed
-            
-            # Update position
-            dt = 0.16  # Time step
-            self.agent_pos += self.agent_vel * dt
-            
-            # Keep agent within bounds with bounce
-            if self.agent_pos.x < 0:
-                self.agent_pos.x = 0
-                self.agent_vel.x *= -0.5
-            elif self.agent_pos.x > 800:
-                self.agent_pos.x = 800
-                self.agent_vel.x *= -0.5
-                
-            if self.agent_pos.y < 0:
-                self.agent_pos.y = 0
-                self.agent_vel.y *= -0.5
-            elif self.agent_pos.y > 600:
-                self.agent_pos.y = 600
-                self.agent_vel.y *= -0.5
-            
-            # Redraw agent
-            self.draw_agent()
-            self.draw_waypoints()  # Make sure waypoints are drawn every frame
-            self.draw_target()
+        profiler = self.profiler
+        if profiler is not None:
+            self.profiled_update(profiler)
+        else:
+            self.advance()
+            if self.world.current_behavior:
+                # Redraw agent
+                self.draw_agent(self.clock.alpha)
+                self.draw_waypoints()  # Make sure waypoints are drawn every frame
+                self.draw_target()
         
         # Schedule next update
         if self.is_running:
-            self.root.after(16, self.update)
+            self.root.after(self.FRAME_MS, self.update)
+
+    def profiled_update(self, profiler):
+        "The same frame as update(), timed per phase; 'tk' is Tk redrawing the canvas."
+        profiler.begin_frame()
+        with profiler.phase("step"):
+            profiler.count("ticks", self.advance())
+        if self.world.current_behavior:
+            with profiler.phase("draw"):
+                self.draw_agent(self.clock.alpha)
+                self.draw_waypoints()
+                self.draw_target()
+                self.canvas.tag_raise("overlay")
+        with profiler.phase("tk"):
+            self.root.update_idletasks()
+        profiler.end_frame()
+        if profiler.frame_count % 10 == 0:
+            self.canvas.itemconfigure(self.profile_overlay, text="\n".join(profiler.overlay_lines()))
+
     def draw_waypoints(self):
         self.canvas.delete("waypoints")
-        if self.current_behavior in ["Circuit", "One Way", "Two Ways"]:
-            behavior = self.get_behavior_instance(self.current_behavior)
+        current_behavior = self.world.current_behavior
+        if current_behavior in ["Circuit", "One Way", "Two Ways"]:
+            behavior = self.world.get_behavior_instance(current_behavior)
             # Draw lines connecting waypoints
             for i in range(len(behavior.waypoints) - 1):
                 x1, y1 = behavior.waypoints[i].x, behavior.waypoints[i].y
@@ -1,60 +1,19 @@
+import argparse
 import tkinter as tk
-import random
-import math
-from collections import deque
-
-from behaviors.seek import Seek
-
-class Vector2D:
-    def __init__(self, x=0, y=0):
-        self.x = x
-        self.y = y
-
-    def __add__(self, other):
-        return Vector2D(self.x + other.x, self.y + other.y)
-
-    def __sub__(self, other):
-        return Vector2D(self.x - other.x, self.y - other.y)
-
-    def __mul__(self, scalar):
-        return Vector2D(self.x * scalar, self.y * scalar)
-
-    def __eq__(self, other):
-        if isinstance(other, Vector2D):
-            return self.x == other.x and self.y == other.y
-        return False
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-    def length(self):
-        return math.sqrt(self.x * self.x + self.y * self.y)
-
-    def length_squared(self):
-        return self.x * self.x + self.y * self.y
-
-    def distance_to(self, other):
-        return (other - self).length()
-
-    def normalized(self):
-        length = self.length()
-        if length == 0:
-            return Vector2D(0, 0)
-        return Vector2D(self.x / length, self.y / length)
-
-    def dot(self, other):
-        return self.x * other.x + self.y * other.y
-
-    def cross(self, other):
-        return self.x * other.y - self.y * other.x
-        
-    def __repr__(self):
-        return f"Vector2D({self.x}, {self.y})"
 
+from simulation.rescue_world import RescueWorld
+from simulation.engine import FixedStepClock, lerp
+from simulation.profiler import FrameProfiler
+from simulation.recording import TrajectoryReplay
+from vector import Vector2D
 
 
 class RescueSimulation:
-    def __init__(self):
+    # One simulation tick per 30 ms of real time at 1x; frames are drawn about every 16 ms
+    TICK_SECONDS = 0.030
+    FRAME_MS = 16
+
+    def __init__(self, replay=None):
         self.root = tk.Tk()
         self.root.title("Rescue Simulation")
 
@@ -73,6 +32,10 @@ class RescueSimulation:
         # Reset button
         self.reset_button = tk.Button(self.control_frame, text="Reset Simulation", command=self.reset_simulation)
         self.reset_button.pack(side=tk.RIGHT, padx=10)
+
+        # Fast-forward: 1x, 10x or 100x simulation ticks per real tick
+        self.speed_button = tk.Button(self.control_frame, text="Speed: 1x", command=self.cycle_speed)
+        self.speed_button.pack(side=tk.RIGHT, padx=10)
         
         # Victim count input
         self.victim_frame = tk.Frame(self.control_frame)
@@ -82,38 +45,40 @@ class RescueSimulation:
         self.victim_entry = tk.Entry(self.victim_frame, textvariable=self.victim_var, width=3)
         self.victim_entry.pack(side=tk.LEFT)
 
-        # Game elements
-        self.grid_size = 50
-        self.city_blocks = []
-        self.victims = []
-        self.hospitals = []
-        self.waypoints = []
-        self.waypoint_graph = {}
-        
-        # Entity states
-        self.npc_pos = Vector2D(50, 50)
-        self.npc_vel = Vector2D(0, 0)
-        self.npc_target = None
-        self.npc_carrying_victim = None
-        self.npc_state = "searching"  # searching, rescuing, delivering
-        
-        self.player_pos = Vector2D(700, 500)
-        self.player_vel = Vector2D(0, 0)
-        self.player_target = None
-        self.player_carrying_victim = None
-        
-        # Game parameters
-        self.max_speed = 3
-        self.max_force = 0.5
-        self.seek = Seek()
-        
-        # Path finding variables
-        self.npc_path = []
-        self.current_waypoint_index = 0
-        self.rescued_count = 0
-        
-        # Initialize game setup
-        self.setup_game()
+        # All simulation state lives in the headless world; this class only draws it.
+        # When replaying a recording the world only holds the restored frames,
+        # on the map the recording was made on.
+        self.replay = TrajectoryReplay(replay) if replay else None
+        self.replay_frame = 0
+        self.replay_paused = False
+        if self.replay is None:
+            self.world = RescueWorld(int(self.victim_var.get()))
+        else:
+            self.world = self.replay.build_world()
+            self.scrubber = tk.Scale(self.control_frame, from_=0, to=len(self.replay) - 1,
+                                     orient=tk.HORIZONTAL, length=300, command=self.scrub)
+            self.scrubber.pack(side=tk.LEFT, padx=10)
+            self.root.bind("<space>", self.toggle_pause)
+
+        # Retained scene: static layers are drawn once, moving items are pooled
+        # and only moved or shown/hidden when their entity changes
+        self.item_coords = {}
+        self.item_visible = {}
+        self.victim_sprites = {}
+        self.sprite_pool = []
+        self.npc_sprites = []
+        self.drawn_victim_version = None
+        self.layers_dirty = False
+        self.draw_static()
+        self.player_sprite = self.create_sprite("player", 15, 'green', "P", 'white', ("Arial", 10), carried=True)
+
+        # Frame profiler, off until F3; F4 exports what it has collected
+        self.profiler = None
+        self.profile_overlay = self.canvas.create_text(
+            8, 8, anchor=tk.NW, text="", fill='black', font=("Courier", 9), state='hidden', tags="overlay"
+        )
+        self.root.bind("<F3>", self.toggle_profiler)
+        self.root.bind("<F4>", self.export_profile)
         
         # Bind keys clicks for player movement
         self.canvas.unbind("<Button-1>") 
@@ -135,621 +100,301 @@ class RescueSimulation:
         # variable to store key states
         self.keys_pressed = set()
         
+        # Fixed simulation ticks, drawn interpolated between the last two
+        self.clock = FixedStepClock(self.TICK_SECONDS)
+        self.previous_positions = None
+        
         # Start game loop
         self.update()
-            
-        
-
-    def setup_game(self):
-        "Initializing the game world with all elements"
-        self.setup_city()
-        self.setup_waypoints()
-        self.create_hospitals()
-        self.spawn_victims(int(self.victim_var.get()))
 
     def reset_simulation(self):
         "Reset the simulation state"
-        # I Cleared here the existing game objects
-        self.victims = []
-        self.npc_pos = Vector2D(50, 50)
-        self.npc_vel = Vector2D(0, 0)
-        self.npc_target = None
-        self.npc_carrying_victim = None
-        self.npc_state = "searching"
-        self.npc_path = []
-        self.current_waypoint_index = 0
-        
-        self.player_pos = Vector2D(700, 500)
-        self.player_vel = Vector2D(0, 0)
-        self.player_target = None
-        self.player_carrying_victim = None
-        
-        self.rescued_count = 0
-        
-        # Here Spawn new victims
-        self.spawn_victims(int(self.victim_var.get()))
-        
-        # Update status
-        self.status_label.config(text=f"Simulation Reset. Victims: {len(self.victims)}")
-
-    def setup_city(self):
-        "I Created here obstacles as city blocks."
-        for x in range(2, 14, 3):
-            for y in range(2, 10, 3):
-                block = {
-                    'x': x * self.grid_size,
-                    'y': y * self.grid_size,
-                    'width': self.grid_size * 2,
-                    'height': self.grid_size * 2
-                }
-                self.city_blocks.append(block)
-
-    def setup_waypoints(self):
-        "Setting up the waypoints and their connections"
-        # Create key waypoints - representing street intersections
-        self.waypoints = [
-            Vector2D(50, 50),    #0
-            Vector2D(750, 50),   
-            Vector2D(750, 550),  #2
-            Vector2D(50, 550),   #3
-            Vector2D(50, 225),  #4 
-            Vector2D(750, 225),  
-            Vector2D(50, 375),   #6
-            Vector2D(750, 375),  
-            Vector2D(225, 50),   #8  
-            Vector2D(225, 550),  #9
-            Vector2D(375, 50),  #10 
-            Vector2D(375, 550),  #11
-            Vector2D(525, 50),   
-            Vector2D(525, 550),  
-            Vector2D(225, 225),  #14
-            Vector2D(375, 225),  
-            Vector2D(525, 225),  
-            Vector2D(225, 375),  
-            Vector2D(375, 375),  
-            Vector2D(525, 375)   
-        ]
-        
-        # I Defined here the connections between waypoints (representing streets)
-        # Each waypoint is a node (intersection) and the connections define navigable paths.
-        self.waypoint_graph = {
-            # Top row connections
-            self.waypoints[0]: [self.waypoints[8], self.waypoints[4], self.waypoints[3]],
-            self.waypoints[8]: [self.waypoints[0], self.waypoints[10], self.waypoints[14]],
-            self.waypoints[10]: [self.waypoints[8], self.waypoints[12], self.waypoints[15]],
-            self.waypoints[12]: [self.waypoints[10], self.waypoints[1], self.waypoints[16]],
-            self.waypoints[1]: [self.waypoints[12], self.waypoints[5], self.waypoints[2]],
-            
-            # Middle row connections
-            self.waypoints[4]: [self.waypoints[0], self.waypoints[14], self.waypoints[6]],
-            self.waypoints[14]: [self.waypoints[8], self.waypoints[4], self.waypoints[15], self.waypoints[17]],
-            self.waypoints[15]: [self.waypoints[10], self.waypoints[14], self.waypoints[16], self.waypoints[18]],
-            self.waypoints[16]: [self.waypoints[12], self.waypoints[15], self.waypoints[5], self.waypoints[19]],
-            self.waypoints[5]: [self.waypoints[1], self.waypoints[16], self.waypoints[7]],
-            
-            # Lower middle row connections
-            self.waypoints[6]: [self.waypoints[4], self.waypoints[17], self.waypoints[3]],
-            self.waypoints[17]: [self.waypoints[14], self.waypoints[6], self.waypoints[18], self.waypoints[9]],
-            self.waypoints[18]: [self.waypoints[15], self.waypoints[17], self.waypoints[19], self.waypoints[11]],
-            self.waypoints[19]: [self.waypoints[16], self.waypoints[18], self.waypoints[7], self.waypoints[13]],
-            self.waypoints[7]: [self.waypoints[5], self.waypoints[19], self.waypoints[2]],
-            
-            # Bottom row connections
-            self.waypoints[3]: [self.waypoints[0], self.waypoints[6], self.waypoints[9]],
-            self.waypoints[9]: [self.waypoints[3], self.waypoints[17], self.waypoints[11]],
-            self.waypoints[11]: [self.waypoints[9], self.waypoints[18], self.waypoints[13]],
-            self.waypoints[13]: [self.waypoints[11], self.waypoints[19], self.waypoints[2]],
-            self.waypoints[2]: [self.waypoints[1], self.waypoints[7], self.waypoints[13]]
-        }
+        if self.replay is not None:
+            self.replay_frame = 0
+            return
+        self.world.reset_simulation(int(self.victim_var.get()))
+        self.previous_positions = None
+        self.status_label.config(text=self.world.status)
+
+    def cycle_speed(self):
+        speed = self.clock.cycle_speed()
+        self.speed_button.config(text=f"Speed: {speed}x")
+
     def key_released(self, event):
     # Here Stoping movement when key is released
-        self.player_vel = Vector2D(0, 0)
-    def spawn_victims(self, count):
-        "Place victims on the map avoiding obstacles."
-        self.victims = []
-        attempted = 0
-        while len(self.victims) < count and attempted < 100:
-            attempted += 1
-            # placing at waypoints first (more realistic - victims on streets)
-            if len(self.victims) < count * 0.7 and self.waypoints:
-                waypoint = random.choice(self.waypoints)
-                # Add slight variation to position
-                x = waypoint.x + random.randint(-15, 15)
-                y = waypoint.y + random.randint(-15, 15)
-            else:
-                # Placing here randomly ensuring not too close to edges make it more random and realistic
-                x = random.randint(50, 750)
-                y = random.randint(50, 550)
-            
-            # Checking if valid position
-            if self.is_valid_position(x, y):
-                # Checking if not too close to existing victims
-                too_close = False
-                for victim in self.victims:
-                    if Vector2D(x, y).distance_to(victim) < 30:
-                        too_close = True
-                        break
-                
-                # Checking if not too close to hospitals
-                for hospital in self.hospitals:
-                    if Vector2D(x, y).distance_to(hospital) < 50:
-                        too_close = True
-                        break
-                        
-                if not too_close:
-                    self.victims.append(Vector2D(x, y))
-                    
-        self.status_label.config(text=f"Victims spawned: {len(self.victims)}")
-
-    def create_hospitals(self):
-        "Placing hospitals at fixed positions."
-        self.hospitals = []
-        self.hospitals.append(Vector2D(50, 50))  # Top-left hospital
-        self.hospitals.append(Vector2D(750, 550))  # Bottom-right hospital
-
-    def find_closest(self, position, entities):
-        "Find the closest entity to a given position. Used when searching of victims and when delivering to the nearest hospital"
-        if not entities:
-            return None
-        return min(entities, key=lambda e: position.distance_to(e))
+        self.world.player_vel = Vector2D(0, 0)
 
      # I Added these methods for WASD movement
     def move_up(self, event):
-        self.player_vel = Vector2D(0, -self.player_speed)
+        self.world.player_vel = Vector2D(0, -self.player_speed)
     
     def move_left(self, event):
-        self.player_vel = Vector2D(-self.player_speed, 0)
+        self.world.player_vel = Vector2D(-self.player_speed, 0)
     
     def move_down(self, event):
-        self.player_vel = Vector2D(0, self.player_speed)
+        self.world.player_vel = Vector2D(0, self.player_speed)
     
     def move_right(self, event):
-        self.player_vel = Vector2D(self.player_speed, 0)
-    
-    # Player this interaction method
-    def check_player_interactions(self):
-        "hERE Checking for player interactions with victims and hospitals"
-        # Check for victim pickup
-        if not self.player_carrying_victim:
-            for victim in self.victims:
-                if self.player_pos.distance_to(victim) < 15:
-                    self.player_carrying_victim = victim
-                    self.victims.remove(victim)
-                    self.status_label.config(text=f"Player picked up victim. Remaining: {len(self.victims)}")
-                    break
-        
-        # Check for hospital dropoff
-        elif self.player_carrying_victim:
-            for hospital in self.hospitals:
-                if self.player_pos.distance_to(hospital) < 20:
-                    self.player_carrying_victim = None
-                    self.rescued_count += 1
-                    self.status_label.config(text=f"Victims rescued: {self.rescued_count} | Remaining: {len(self.victims)}")
-                    break
-    
-    def is_valid_position(self, x, y, radius=15, check_npc=True):
-        "I Checked here if the position collides with a city block or NPC."
-        # Check collision with city blocks
-        for block in self.city_blocks:
-            if (x > block['x'] - radius and x < block['x'] + block['width'] + radius and
-                y > block['y'] - radius and y < block['y'] + block['height'] + radius):
-                return False
-        
-        # Check collision with NPC if requested
-        if check_npc:
-            npc_collision_distance = 30  # Combined radius of player and NPC
-            if Vector2D(x, y).distance_to(self.npc_pos) < npc_collision_distance:
-                return False
-        
-        return True
-
-    def get_closest_waypoint(self, position):
-        """Find the closest waypoint to the given position."""
-        if not self.waypoints:
-            return None
-        return min(self.waypoints, key=lambda w: position.distance_to(w))
-
-    def bfs_find_path(self, start_pos, end_pos):
-        """Find path from start to end using BFS on waypoint graph."""
-        # First get closest waypoints to start and end positions
-        start_waypoint = self.get_closest_waypoint(start_pos)
-        end_waypoint = self.get_closest_waypoint(end_pos)
-        
-        if start_waypoint is None or end_waypoint is None:
-            return [start_pos, end_pos]  # Direct line if no waypoints
-            
-        # If start and end are close enough, go direct
-        if start_pos.distance_to(end_pos) < 100:
-            return [start_pos, end_pos]
-        
-        # Use BFS to find path between waypoints
-        queue = deque([(start_waypoint, [start_waypoint])])
-        visited = set([start_waypoint])
-        
-        while queue:
-            current, path = queue.popleft()
-            
-            if current == end_waypoint:
-                # Complete path found, add start and end points
-                complete_path = [start_pos]
-                complete_path.extend(path)
-                complete_path.append(end_pos)
-                return complete_path
-                
-            for neighbor in self.waypoint_graph.get(current, []):
-                # print("current",current)
-                # print(neighbor)
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
-                    # print("iteration --------------")
-                    
-        # No path found between waypoints, try direct path
-        return [start_pos, end_pos]
-
-    def update_npc(self):
-        "I am trying here to update NPC behavior based on state and targets."
-        # State machine for NPC behavior
-        if self.npc_state == "searching":
-            # If not carrying a victim, find the closest one
-            if not self.victims:
-                self.status_label.config(text="All victims rescued!")
-                return
-                
-            # Find closest victim if we don't have a target
-            if self.npc_target is None:
-                self.npc_target = self.find_closest(self.npc_pos, self.victims)
-                if self.npc_target:
-                    self.npc_path = self.bfs_find_path(self.npc_pos, self.npc_target)
-                    self.current_waypoint_index = 0
-            
-            # If target exists but was rescued by player, find new target
-            elif self.npc_target not in self.victims:
-                self.npc_target = self.find_closest(self.npc_pos, self.victims)
-                if self.npc_target:
-                    self.npc_path = self.bfs_find_path(self.npc_pos, self.npc_target)
-                    self.current_waypoint_index = 0
-            
-            # Check if NPC reached a victim
-            if self.npc_target and self.npc_pos.distance_to(self.npc_target) < 15:
-                self.npc_carrying_victim = self.npc_target
-                if self.npc_target in self.victims:
-                    self.victims.remove(self.npc_target)
-                
-                # Switch to delivering state
-                self.npc_state = "delivering"
-                self.npc_target = self.find_closest(self.npc_pos, self.hospitals)
-                if self.npc_target:
-                    self.npc_path = self.bfs_find_path(self.npc_pos, self.npc_target)
-                    self.current_waypoint_index = 0
-
-        elif self.npc_state == "delivering":
-            # If carrying a victim, head to hospital
-            if self.npc_target is None or self.npc_target not in self.hospitals:
-                self.npc_target = self.find_closest(self.npc_pos, self.hospitals)
-                if self.npc_target:
-                    self.npc_path = self.bfs_find_path(self.npc_pos, self.npc_target)
-                    self.current_waypoint_index = 0
-            
-            # Check if NPC reached a hospital
-            if self.npc_target and self.npc_pos.distance_to(self.npc_target) < 15:
-                self.npc_carrying_victim = None
-                self.rescued_count += 1
-                self.status_label.config(text=f"Victims rescued: {self.rescued_count} | Remaining: {len(self.victims)}")
-                
-                # Switch back to searching state
-                self.npc_state = "searching"
-                self.npc_target = self.find_closest(self.npc_pos, self.victims)
-                if self.npc_target:
-                    self.npc_path = self.bfs_find_path(self.npc_pos, self.npc_target)
-                    self.current_waypoint_index = 0
-        
-        # Move NPC along path regardless of state
-        self.move_along_path()
-    
-    def move_along_path(self):
-        "Move NPC along the calculated path."
-        player_distance = self.npc_pos.distance_to(self.player_pos)
-        if player_distance < 60:
-            # Try to avoid player
-            if self.avoid_obstacle():
-                # Successfully avoided player, may need to recalculate path
-                if self.npc_target:
-                    # Only recalculate if we've moved significantly off path
-                    if self.current_waypoint_index < len(self.npc_path):
-                        current_target = self.npc_path[self.current_waypoint_index]
-                        if self.npc_pos.distance_to(current_target) > 40:
-                            # Recalculate path from current position
-                            self.npc_path = self.bfs_find_path(self.npc_pos, self.npc_target)
-                            self.current_waypoint_index = 0
-                return
-        
-        # Continue with regular path following if no player avoidance needed
-        if not self.npc_path or self.current_waypoint_index >= len(self.npc_path):
-            return
-            
-        current_target = self.npc_path[self.current_waypoint_index]
-        
-        # If close to current waypoint, move to next one
-        if self.npc_pos.distance_to(current_target) < 10:
-            self.current_waypoint_index += 1
-            if self.current_waypoint_index >= len(self.npc_path):
-                # End of path reached
-                self.npc_vel = Vector2D(0, 0)
-                return
-            current_target = self.npc_path[self.current_waypoint_index]
-        
-        # Calculate steering force towards current waypoint
-        steering = self.seek.calculate(
-            self.npc_pos, self.npc_vel,
-            current_target, Vector2D(0, 0),
-            self.max_speed, self.max_force
-        )
-        
-        # Apply steering force
-        self.npc_vel = self.npc_vel + steering
-        
-        # Limit speed
-        if self.npc_vel.length() > self.max_speed:
-            self.npc_vel = self.npc_vel.normalized() * self.max_speed
-            
-        # Move NPC
-        new_pos = self.npc_pos + self.npc_vel
-        
-        # Check if new position is valid (not inside obstacle)
-        if self.is_valid_position(new_pos.x, new_pos.y, check_npc=False):
-            self.npc_pos = new_pos
+        self.world.player_vel = Vector2D(self.player_speed, 0)
+
+    def toggle_profiler(self, event=None):
+        "Start or stop profiling the update loop and show or hide the overlay."
+        if self.profiler is None:
+            self.profiler = FrameProfiler().attach(self.world)
+            self.canvas.itemconfigure(self.profile_overlay, state='normal')
         else:
-            # If invalid, try to steer around obstacle
-            self.avoid_obstacle()
-            
-    def avoid_obstacle(self):
-        """Simple obstacle avoidance behavior."""
-        player_distance = self.npc_pos.distance_to(self.player_pos)
-        if player_distance < 60:  # Detect player from further away
-            # Calculate vector away from player
-            away_vector = self.npc_pos - self.player_pos
-            if away_vector.length() > 0:
-                away_vector = away_vector.normalized() * self.max_speed
-                
-                # Stronger avoidance force when closer to player
-                avoidance_force = self.max_force * (1 + (60 - player_distance) / 30)
-                
-                # Apply steering away from player
-                self.npc_vel = self.npc_vel + (away_vector * avoidance_force)
-                
-                # Limit speed
-                if self.npc_vel.length() > self.max_speed:
-                    self.npc_vel = self.npc_vel.normalized() * self.max_speed
-                
-                # Try moving with new velocity
-                new_pos = self.npc_pos + self.npc_vel
-                
-                # Check if new position is valid (ignoring NPC-player collision check to avoid recursion)
-                if self.is_valid_position(new_pos.x, new_pos.y, check_npc=False):
-                    self.npc_pos = new_pos
-                    return True
-        # If player avoidance didn't succeed or wasn't needed, use original method
-        # Get the closest waypoint
-        closest_waypoint = self.get_closest_waypoint(self.npc_pos)
-        
-        if closest_waypoint:
-            # Try steering towards the closest waypoint
-            steering = self.seek.calculate(
-                self.npc_pos, self.npc_vel,
-                closest_waypoint, Vector2D(0, 0),
-                self.max_speed, self.max_force * 2  # Stronger force to avoid obstacle
-            )
-            
-            # Apply steering
-            self.npc_vel = self.npc_vel + steering
-            
-            # Limit speed
-            if self.npc_vel.length() > self.max_speed:
-                self.npc_vel = self.npc_vel.normalized() * self.max_speed
-                
-            # Move NPC
-            new_pos = self.npc_pos + self.npc_vel
-            
-            # Check if new position is valid
-            if self.is_valid_position(new_pos.x, new_pos.y, check_npc=False):
-                self.npc_pos = new_pos
-                return True
-            else:
-                # If still invalid, try random direction
-                self.npc_vel = Vector2D(random.uniform(-1, 1), random.uniform(-1, 1)).normalized() * self.max_speed
-                return False
-        return False
-                
+            self.profiler.detach()
+            self.profiler = None
+            self.canvas.itemconfigure(self.profile_overlay, state='hidden')
+
+    def export_profile(self, event=None):
+        if self.profiler is None:
+            self.status_label.config(text="Profiler is off (F3 to start)")
+            return
+        self.profiler.export_json("profile.json")
+        self.profiler.export_csv("profile.csv")
+        self.status_label.config(text="Profile written to profile.json and profile.csv")
+
     def on_mouse_click(self, event):
         """Handle mouse click for player movement."""
         x, y = event.x, event.y
         
         # Check if clicking on a victim (to pick up)
-        if not self.player_carrying_victim:
-            for victim in self.victims:
-                if victim.distance_to(Vector2D(x, y)) < 15:
-                    # Set target to victim position for pickup
-                    self.player_target = victim
-                    return
+        if not self.world.player_carrying_victim:
+            victim = self.world.victims.nearest(Vector2D(x, y), max_distance=15)
+            if victim is not None:
+                # Set target to victim position for pickup
+                self.world.set_player_target(self.world.victims[victim], victim)
+                return
         
         # Check if clicking on a hospital (to drop off)
-        if self.player_carrying_victim:
-            for hospital in self.hospitals:
-                if hospital.distance_to(Vector2D(x, y)) < 30:
-                    # Set target to hospital position for dropoff
-                    self.player_target = hospital
-                    return
+        if self.world.player_carrying_victim:
+            hospital = self.world.hospital_index.nearest(Vector2D(x, y), max_distance=30)
+            if hospital is not None:
+                # Set target to hospital position for dropoff
+                self.world.set_player_target(hospital)
+                return
         
         # Otherwise, set target to mouse position if valid
-        if self.is_valid_position(x, y):
-            self.player_target = Vector2D(x, y)
+        if self.world.is_valid_position(x, y):
+            self.world.set_player_target(Vector2D(x, y))
     
-    def update_player(self):
-        "Here i am updating player position and actions."
-        if self.player_target:
-            # Calculate steering force
-            steering = self.seek.calculate(
-                self.player_pos, self.player_vel,
-                self.player_target, Vector2D(0, 0),
-                self.max_speed, self.max_force
-            )
-            
-            # Apply steering
-            self.player_vel = self.player_vel + steering
-            
-            # Limit speed
-            if self.player_vel.length() > self.max_speed:
-                self.player_vel = self.player_vel.normalized() * self.max_speed
-                
-            # Move player
-            new_pos = self.player_pos + self.player_vel
-            
-            # Check if new position is valid
-            if self.is_valid_position(new_pos.x, new_pos.y):
-                self.player_pos = new_pos
-            # Check if reached target
-            if self.player_pos.distance_to(self.player_target) < 10:
-                # Check if target is a victim (for pickup)
-                if not self.player_carrying_victim and self.player_target in self.victims:
-                    self.player_carrying_victim = self.player_target
-                    self.victims.remove(self.player_target)
-                    self.status_label.config(text=f"Player picked up victim. Remaining: {len(self.victims)}")
-                
-                # Check if target is a hospital (for dropoff)
-                elif self.player_carrying_victim:
-                    for hospital in self.hospitals:
-                        if self.player_pos.distance_to(hospital) < 20:
-                            self.player_carrying_victim = None
-                            self.rescued_count += 1
-                            self.status_label.config(text=f"Victims rescued: {self.rescued_count} | Remaining: {len(self.victims)}")
-                            break
-                
-                # Reset target
-                self.player_target = None
-                self.player_vel = Vector2D(0, 0)
-        elif self.player_vel.length() > 0:
-            # Move player directly with current velocity
-            new_pos = self.player_pos + self.player_vel
-            
-            # Check if new position is valid
-            if self.is_valid_position(new_pos.x, new_pos.y):
-                self.player_pos = new_pos
-                
-            # Check for interactions
-            self.check_player_interactions()
-    def draw(self):
-        """Draw all game elements to the canvas."""
-        self.canvas.delete("all")
+    def draw_static(self):
+        """Draw the streets, blocks, waypoints and hospitals once.
+
+        These never change while the map stays the same, so draw() leaves
+        them alone instead of recreating them every frame.
+        """
+        world = self.world
+        self.canvas.delete("static")
         
         # Draw waypoint connections (streets)
-        for waypoint, neighbors in self.waypoint_graph.items():
-            for neighbor in neighbors:
-                self.canvas.create_line(
-                    waypoint.x, waypoint.y, 
-                    neighbor.x, neighbor.y, 
-                    fill='darkgray', width=5
-                )
+        for x1, y1, x2, y2 in world.graph.segments():
+            self.canvas.create_line(
+                x1, y1, x2, y2,
+                fill='darkgray', width=5, tags="static"
+            )
         
         # Draw city blocks (buildings)
-        for block in self.city_blocks:
+        for block in world.city_blocks:
             self.canvas.create_rectangle(
                 block['x'], block['y'],
                 block['x'] + block['width'],
                 block['y'] + block['height'],
-                fill='gray', outline='black'
+                fill='gray', outline='black', tags="static"
             )
         
         # Draw waypoints
-        for waypoint in self.waypoints:
+        for waypoint in world.waypoints:
             self.canvas.create_oval(
                 waypoint.x - 3, waypoint.y - 3,
                 waypoint.x + 3, waypoint.y + 3,
-                fill='gray', outline='gray'
+                fill='gray', outline='gray', tags="static"
             )
         
         # Draw hospitals
-        for hospital in self.hospitals:
+        for hospital in world.hospitals:
             self.canvas.create_rectangle(
                 hospital.x - 20, hospital.y - 20,
                 hospital.x + 20, hospital.y + 20,
-                fill='white', outline='red', width=2
+                fill='white', outline='red', width=2, tags="static"
             )
             self.canvas.create_text(
                 hospital.x, hospital.y,
-                text="H", fill='red', font=("Arial", 16, "bold")
-            )
-        
-        # Draw victims
-        for victim in self.victims:
-            self.canvas.create_oval(
-                victim.x - 10, victim.y - 10,
-                victim.x + 10, victim.y + 10,
-                fill='yellow', outline='black'
-            )
-            self.canvas.create_text(
-                victim.x, victim.y,
-                text="V", fill='black', font=("Arial", 10)
-            )
-        
-        # Draw NPC's path
-        if self.npc_path and len(self.npc_path) > 1:
-            for i in range(len(self.npc_path) - 1):
-                self.canvas.create_line(
-                    self.npc_path[i].x, self.npc_path[i].y,
-                    self.npc_path[i+1].x, self.npc_path[i+1].y,
-                    fill='blue', width=2, dash=(4, 4)
-                )
-        
-        # Draw NPC
-        self.canvas.create_oval(
-            self.npc_pos.x - 15, self.npc_pos.y - 15,
-            self.npc_pos.x + 15, self.npc_pos.y + 15,
-            fill='blue', outline='black'
-        )
-        self.canvas.create_text(
-            self.npc_pos.x, self.npc_pos.y,
-            text="NPC", fill='white', font=("Arial", 8)
-        )
-        
-        # Draw carried victim for NPC
-        if self.npc_carrying_victim:
-            self.canvas.create_oval(
-                self.npc_pos.x - 5, self.npc_pos.y - 5,
-                self.npc_pos.x + 5, self.npc_pos.y + 5,
-                fill='yellow', outline='black'
-            )
-        
-        # Draw player
-        self.canvas.create_oval(
-            self.player_pos.x - 15, self.player_pos.y - 15,
-            self.player_pos.x + 15, self.player_pos.y + 15,
-            fill='green', outline='black'
-        )
-        self.canvas.create_text(
-            self.player_pos.x, self.player_pos.y,
-            text="P", fill='white', font=("Arial", 10)
-        )
-        
-        # Draw carried victim for player
-        if self.player_carrying_victim:
-            self.canvas.create_oval(
-                self.player_pos.x - 5, self.player_pos.y - 5,
-                self.player_pos.x + 5, self.player_pos.y + 5,
-                fill='yellow', outline='black'
+                text="H", fill='red', font=("Arial", 16, "bold"), tags="static"
             )
+        self.canvas.tag_lower("static")
+
+    def move_item(self, item, *coords):
+        "Move a canvas item, skipping the Tk call when it has not moved."
+        if self.item_coords.get(item) != coords:
+            self.item_coords[item] = coords
+            self.canvas.coords(item, *coords)
+
+    def show_item(self, item, visible):
+        if self.item_visible.get(item) != visible:
+            self.item_visible[item] = visible
+            self.canvas.itemconfigure(item, state='normal' if visible else 'hidden')
+
+    def create_sprite(self, layer, radius, fill, text, text_fill, font, carried=False):
+        "Create the hidden canvas items for one moving entity."
+        sprite = {
+            'body': self.canvas.create_oval(0, 0, 0, 0, fill=fill, outline='black', state='hidden', tags=layer),
+            'label': self.canvas.create_text(0, 0, text=text, fill=text_fill, font=font, state='hidden', tags=layer),
+            'radius': radius,
+        }
+        if carried:
+            sprite['carried'] = self.canvas.create_oval(0, 0, 0, 0, fill='yellow', outline='black', state='hidden', tags=layer)
+        self.layers_dirty = True
+        return sprite
+
+    def place_sprite(self, sprite, pos, carrying=False):
+        r = sprite['radius']
+        self.move_item(sprite['body'], pos.x - r, pos.y - r, pos.x + r, pos.y + r)
+        self.move_item(sprite['label'], pos.x, pos.y)
+        self.show_item(sprite['body'], True)
+        self.show_item(sprite['label'], True)
+        if 'carried' in sprite:
+            if carrying:
+                self.move_item(sprite['carried'], pos.x - 5, pos.y - 5, pos.x + 5, pos.y + 5)
+            self.show_item(sprite['carried'], bool(carrying))
+
+    def hide_sprite(self, sprite):
+        for key in ('body', 'label', 'carried'):
+            if key in sprite:
+                self.show_item(sprite[key], False)
+
+    def draw_victims(self):
+        "Show new victims and hide removed ones, reusing pooled items."
+        world = self.world
+        if world.victim_version == self.drawn_victim_version:
+            return
+        self.drawn_victim_version = world.victim_version
+        current = world.victims
+        for victim in [v for v in self.victim_sprites if v not in current]:
+            sprite = self.victim_sprites.pop(victim)
+            self.hide_sprite(sprite)
+            self.sprite_pool.append(sprite)
+        for victim, position in world.victims.items():
+            if victim not in self.victim_sprites:
+                if self.sprite_pool:
+                    sprite = self.sprite_pool.pop()
+                else:
+                    sprite = self.create_sprite("victim", 10, 'yellow', "V", 'black', ("Arial", 10))
+                self.victim_sprites[victim] = sprite
+                self.place_sprite(sprite, position)
+
+    def draw_npcs(self, alpha=1.0):
+        world = self.world
+        previous = self.previous_positions
+        while len(self.npc_sprites) < len(world.npcs):
+            sprite = self.create_sprite("npc", 15, 'blue', "NPC", 'white', ("Arial", 8), carried=True)
+            sprite['path'] = self.canvas.create_line(0, 0, 0, 0, fill='blue', width=2, dash=(4, 4), state='hidden', tags="path")
+            sprite['drawn_path'] = None
+            self.npc_sprites.append(sprite)
+        for i, sprite in enumerate(self.npc_sprites):
+            if i >= len(world.npcs):
+                self.hide_sprite(sprite)
+                self.show_item(sprite['path'], False)
+                continue
+            npc = world.npcs[i]
+            start = previous[i] if previous is not None and i < len(previous) - 1 else None
+            self.place_sprite(sprite, lerp(start, npc.pos, alpha), npc.carrying_victim)
+
+            # Paths are replaced, never edited, so identity tells us when to redraw
+            if sprite['drawn_path'] is not npc.path:
+                sprite['drawn_path'] = npc.path
+                if npc.path and len(npc.path) > 1:
+                    self.move_item(sprite['path'], *[c for point in npc.path for c in (point.x, point.y)])
+                    self.show_item(sprite['path'], True)
+                else:
+                    self.show_item(sprite['path'], False)
+
+    def draw(self, alpha=1.0):
+        """Update only the moving canvas items; static layers were drawn once.
+
+        Agents are drawn `alpha` of the way from their positions before the
+        last tick to their current ones.
+        """
+        world = self.world
+        self.draw_victims()
+        self.draw_npcs(alpha)
+        previous = self.previous_positions
+        player = lerp(previous[-1] if previous is not None else None, world.player_pos, alpha)
+        self.place_sprite(self.player_sprite, player, world.player_carrying_victim)
+
+        # Keep the original stacking order when new pooled items were created
+        if self.layers_dirty:
+            self.layers_dirty = False
+            for layer in ("victim", "path", "npc", "player", "overlay"):
+                self.canvas.tag_raise(layer)
     
-    def update(self):
-        """Main game loop."""
-        self.update_npc()
-        self.update_player()
+    def scrub(self, value):
+        self.replay_frame = int(float(value))
+
+    def toggle_pause(self, event=None):
+        self.replay_paused = not self.replay_paused
+
+    def replay_update(self):
+        "Show the recorded frame due now instead of stepping the world (one frame per tick)."
+        self.world.restore(self.replay.frame(self.replay_frame))
+        self.status_label.config(text=f"Replay tick {self.world.tick} | Rescued: {self.world.rescued_count}")
         self.draw()
-        self.root.after(30, self.update)  # Update every 30ms (approx 33 FPS)
+        steps = self.clock.advance()
+        if steps and not self.replay_paused and self.replay_frame < len(self.replay) - 1:
+            self.replay_frame = min(self.replay_frame + steps, len(self.replay) - 1)
+            self.scrubber.set(self.replay_frame)
+
+    def advance(self):
+        "Run the ticks due since the last frame; returns how many ran."
+        world = self.world
+        steps = self.clock.advance()
+        for i in range(steps):
+            if i == steps - 1:
+                self.previous_positions = [npc.pos for npc in world.npcs]
+                self.previous_positions.append(world.player_pos)
+            world.step()
+        return steps
+
+    def update(self):
+        """Main game loop: fixed ticks, one interpolated draw per frame."""
+        profiler = self.profiler
+        if self.replay is not None:
+            self.replay_update()
+        elif profiler is None:
+            self.advance()
+            if self.status_label.cget("text") != self.world.status:
+                self.status_label.config(text=self.world.status)
+            self.draw(self.clock.alpha)
+        else:
+            self.profiled_update(profiler)
+        self.root.after(self.FRAME_MS, self.update)
+
+    def profiled_update(self, profiler):
+        "The same frame as update(), timed per phase; 'tk' is Tk redrawing the canvas."
+        profiler.begin_frame()
+        with profiler.phase("step"):
+            profiler.count("ticks", self.advance())
+        with profiler.phase("draw"):
+            if self.status_label.cget("text") != self.world.status:
+                self.status_label.config(text=self.world.status)
+            self.draw(self.clock.alpha)
+        with profiler.phase("tk"):
+            self.root.update_idletasks()
+        profiler.end_frame()
+        if profiler.frame_count % 10 == 0:
+            self.canvas.itemconfigure(self.profile_overlay, text="\n".join(profiler.overlay_lines()))
     
     def run(self):
         "Start the game."
         self.root.mainloop()
 
 if __name__ == "__main__":
-    game = RescueSimulation()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Rescue simulation")
+    parser.add_argument("--replay", help="play back a recording made with python -m simulation.recording")
+    args = parser.parse_args()
+    try:
+        game = RescueSimulation(replay=args.replay)
+    except ValueError as error:
+        parser.error(str(error))
+    game.run()
@@ -0,0 +1,91 @@
+import heapq
+import math
+
+
+class AStarPlanner:
+    """A* over a WaypointGraph using real street lengths.
+
+    Edge costs are the Euclidean distance between connected waypoints and the
+    heuristic is the straight-line distance to the goal. Searches run on
+    node ids. Per-node scratch buffers are allocated once and reused; a
+    generation stamp marks which entries belong to the current search so
+    nothing has to be cleared.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.xs = graph.xs.tolist()
+        self.ys = graph.ys.tolist()
+        self.neighbors = graph.edge_lists()
+
+        count = len(graph)
+        self.g_score = [0.0] * count
+        self.parent = [-1] * count
+        self.stamp = [0] * count
+        self.closed = [0] * count
+        self.generation = 0
+
+        # Stats for comparing planners
+        self.searches = 0
+        self.nodes_expanded = 0
+        self.last_expanded = 0
+
+    def heuristic(self, node, goal):
+        return math.hypot(self.xs[goal] - self.xs[node], self.ys[goal] - self.ys[node])
+
+    def path_ids(self, start, end):
+        "Node ids of the shortest route from start to end, or None if unreachable."
+        self.generation += 1
+        generation = self.generation
+        g_score, parent, stamp, closed = self.g_score, self.parent, self.stamp, self.closed
+
+        g_score[start] = 0.0
+        parent[start] = -1
+        stamp[start] = generation
+        open_heap = [(self.heuristic(start, end), 0.0, start)]
+        expanded = 0
+        found = False
+
+        while open_heap:
+            _, g, current = heapq.heappop(open_heap)
+            if closed[current] == generation:
+                continue
+            closed[current] = generation
+            expanded += 1
+            if current == end:
+                found = True
+                break
+            for neighbor, length in self.neighbors[current]:
+                if closed[neighbor] == generation:
+                    continue
+                tentative = g + length
+                if stamp[neighbor] != generation or tentative < g_score[neighbor]:
+                    stamp[neighbor] = generation
+                    g_score[neighbor] = tentative
+                    parent[neighbor] = current
+                    heapq.heappush(open_heap, (tentative + self.heuristic(neighbor, end), tentative, neighbor))
+
+        self.searches += 1
+        self.nodes_expanded += expanded
+        self.last_expanded = expanded
+        if not found:
+            return None
+
+        path = [end]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def path_length(self, path):
+        "Total street length of a list of node ids."
+        xs, ys = self.xs, self.ys
+        return sum(math.hypot(xs[b] - xs[a], ys[b] - ys[a]) for a, b in zip(path, path[1:]))
+
+    def stats(self):
+        return {
+            "searches": self.searches,
+            "nodes_expanded": self.nodes_expanded,
+            "last_expanded": self.last_expanded,
+            "mean_expanded": self.nodes_expanded / self.searches if self.searches else 0.0,
+        }
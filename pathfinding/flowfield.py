@@ -0,0 +1,124 @@
+import heapq
+import math
+
+import numpy as np
+
+from vector import Vector2D
+
+# 8-connected moves as (di, dj, cost)
+MOVES = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+         (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))]
+
+
+class FlowField:
+    """Shortest-path directions from every free cell to the nearest of several goals.
+
+    Built by one multi-source Dijkstra over the navigation grid of an
+    ObstacleMap (cells whose centre is inside an inflated block are walls;
+    diagonal moves may not cut their corners, and wall cells point out of
+    their block along the distance field gradient). After that, the next heading
+    for any number of agents is an array lookup: heading() for one position,
+    headings() for an (N, 2) batch. `goal` holds, per cell, the index of the
+    goal it flows to.
+    """
+
+    def __init__(self, obstacle_map, goals):
+        self.origin_x = obstacle_map.origin_x
+        self.origin_y = obstacle_map.origin_y
+        self.cell_size = obstacle_map.cell_size
+        self.rows, self.cols = obstacle_map.sdf.shape
+        self.goals = list(goals)
+        self.walls = obstacle_map.sdf <= 0
+        self.distance, self.goal = self._dijkstra()
+        self.direction_x, self.direction_y = self._directions()
+        # Inside a wall cell, head straight out of the block
+        self.direction_x[self.walls] = obstacle_map.grad_x[self.walls]
+        self.direction_y[self.walls] = obstacle_map.grad_y[self.walls]
+
+    def cell_of(self, x, y):
+        "Grid cell of a point, clamped onto the grid."
+        i = int((x - self.origin_x) // self.cell_size)
+        j = int((y - self.origin_y) // self.cell_size)
+        return min(max(i, 0), self.cols - 1), min(max(j, 0), self.rows - 1)
+
+    def _dijkstra(self):
+        rows, cols = self.rows, self.cols
+        walls = self.walls.ravel().tolist()
+        distance = [math.inf] * (rows * cols)
+        goal = [-1] * (rows * cols)
+        heap = []
+        for index, position in enumerate(self.goals):
+            i, j = self.cell_of(position.x, position.y)
+            cell = j * cols + i
+            if distance[cell] > 0:
+                distance[cell] = 0.0
+                goal[cell] = index
+                heap.append((0.0, cell))
+        heapq.heapify(heap)
+
+        while heap:
+            dist, cell = heapq.heappop(heap)
+            if dist > distance[cell]:
+                continue
+            j, i = divmod(cell, cols)
+            for di, dj, cost in MOVES:
+                ni, nj = i + di, j + dj
+                if ni < 0 or nj < 0 or ni >= cols or nj >= rows:
+                    continue
+                neighbor = nj * cols + ni
+                if walls[neighbor]:
+                    continue
+                # No squeezing diagonally between two wall cells
+                if di and dj and (walls[j * cols + ni] or walls[nj * cols + i]):
+                    continue
+                candidate = dist + cost
+                if candidate < distance[neighbor]:
+                    distance[neighbor] = candidate
+                    goal[neighbor] = goal[cell]
+                    heapq.heappush(heap, (candidate, neighbor))
+
+        return (np.array(distance, dtype=np.float32).reshape(rows, cols),
+                np.array(goal, dtype=np.int32).reshape(rows, cols))
+
+    def _directions(self):
+        "Unit vector per cell towards its lowest-distance neighbour (zero at goals and unreachable cells)."
+        rows, cols = self.rows, self.cols
+        padded = np.full((rows + 2, cols + 2), np.inf, dtype=np.float32)
+        padded[1:-1, 1:-1] = self.distance
+        walls = np.ones((rows + 2, cols + 2), dtype=bool)
+        walls[1:-1, 1:-1] = self.walls
+        best = self.distance.copy()
+        direction_x = np.zeros((rows, cols), dtype=np.float32)
+        direction_y = np.zeros((rows, cols), dtype=np.float32)
+        for di, dj, cost in MOVES:
+            candidate = padded[1 + dj:rows + 1 + dj, 1 + di:cols + 1 + di]
+            better = candidate < best
+            if di and dj:
+                better &= ~walls[1 + dj:rows + 1 + dj, 1:cols + 1] & ~walls[1:rows + 1, 1 + di:cols + 1 + di]
+            best = np.where(better, candidate, best)
+            direction_x[better] = di / math.hypot(di, dj)
+            direction_y[better] = dj / math.hypot(di, dj)
+        return direction_x, direction_y
+
+    def heading(self, x, y):
+        "Unit heading towards the nearest goal from (x, y)."
+        i, j = self.cell_of(x, y)
+        return Vector2D(float(self.direction_x[j, i]), float(self.direction_y[j, i]))
+
+    def headings(self, positions):
+        "(N, 2) headings for an (N, 2) array of positions, in one lookup."
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        i = np.clip(((positions[:, 0] - self.origin_x) // self.cell_size).astype(np.int64), 0, self.cols - 1)
+        j = np.clip(((positions[:, 1] - self.origin_y) // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return np.stack([self.direction_x[j, i], self.direction_y[j, i]], axis=1)
+
+    def goal_at(self, x, y):
+        "The goal (as given) that the flow from (x, y) leads to, or None if none is reachable."
+        i, j = self.cell_of(x, y)
+        index = int(self.goal[j, i])
+        return self.goals[index] if index >= 0 else None
+
+    def distance_at(self, x, y):
+        "Path length in world units from (x, y) to its goal (inf if unreachable)."
+        i, j = self.cell_of(x, y)
+        return float(self.distance[j, i]) * self.cell_size
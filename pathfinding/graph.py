@@ -0,0 +1,129 @@
+import math
+
+import numpy as np
+
+from vector import Vector2D
+
+
+class WaypointGraph:
+    """Street graph over integer node ids.
+
+    Node i sits at (xs[i], ys[i]); its neighbours are
+    indices[indptr[i]:indptr[i + 1]] (CSR), in the order they were given,
+    and lengths holds the street length of each of those entries. Planners
+    search over ids only; points (one shared Vector2D per node) are for
+    turning a finished route into waypoints at the very end.
+
+    Node positions and links never change, but a street can be closed
+    (set_street_open), which sets its lengths to infinity until it is
+    reopened; closed links are left out of neighbor_lists() and edge_lists().
+    """
+
+    def __init__(self, xs, ys, indptr, indices, points=None):
+        self.xs = np.ascontiguousarray(xs, dtype=np.float64)
+        self.ys = np.ascontiguousarray(ys, dtype=np.float64)
+        self.indptr = np.ascontiguousarray(indptr, dtype=np.int64)
+        self.indices = np.ascontiguousarray(indices, dtype=np.int32)
+        sources = np.repeat(np.arange(len(self.xs)), np.diff(self.indptr))
+        self.street_lengths = np.hypot(self.xs[self.indices] - self.xs[sources], self.ys[self.indices] - self.ys[sources])
+        self.lengths = self.street_lengths.copy()
+        if points is None:
+            points = [Vector2D(x, y) for x, y in zip(self.xs.tolist(), self.ys.tolist())]
+        self.points = points
+        self._neighbor_lists = None
+
+    @classmethod
+    def from_adjacency(cls, waypoints, adjacency):
+        "Build from a list of Vector2D waypoints and a {waypoint: [neighbours]} dict (the waypoints are kept as points)."
+        ids = {waypoint: i for i, waypoint in enumerate(waypoints)}
+        rows = [[ids[neighbor] for neighbor in adjacency.get(waypoint, [])] for waypoint in waypoints]
+        indptr = np.zeros(len(waypoints) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=indptr[1:])
+        indices = np.array([j for row in rows for j in row], dtype=np.int32)
+        coords = np.array([(w.x, w.y) for w in waypoints], dtype=np.float64).reshape(-1, 2)
+        return cls(coords[:, 0], coords[:, 1], indptr, indices, points=list(waypoints))
+
+    @classmethod
+    def from_edges(cls, xs, ys, edges):
+        "Build from coordinates and an (E, 2) array of undirected edges, each listed once."
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        sources = np.concatenate([edges[:, 0], edges[:, 1]])
+        targets = np.concatenate([edges[:, 1], edges[:, 0]])
+        order = np.lexsort((targets, sources))
+        indptr = np.searchsorted(sources[order], np.arange(len(xs) + 1))
+        return cls(xs, ys, indptr, targets[order])
+
+    def __len__(self):
+        return len(self.xs)
+
+    @property
+    def edge_count(self):
+        "Directed CSR entries (each two-way street counts twice)."
+        return len(self.indices)
+
+    def neighbors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def neighbor_lists(self):
+        "Per-node Python lists of open neighbour ids, built once, for search loops that run in plain Python."
+        if self._neighbor_lists is None:
+            indptr = self.indptr.tolist()
+            indices = self.indices.tolist()
+            lengths = self.lengths.tolist()
+            self._neighbor_lists = [
+                [indices[k] for k in range(indptr[i], indptr[i + 1]) if lengths[k] != math.inf]
+                for i in range(len(self))
+            ]
+        return self._neighbor_lists
+
+    def edge_lists(self, nodes=None):
+        "(neighbour, length) pairs of the open streets out of each node (all nodes, or those given)."
+        if nodes is None:
+            indptr = self.indptr.tolist()
+            edges = list(zip(self.indices.tolist(), self.lengths.tolist()))
+            return [[edge for edge in edges[indptr[i]:indptr[i + 1]] if edge[1] != math.inf] for i in range(len(self))]
+        lists = []
+        for i in nodes:
+            start, stop = self.indptr[i], self.indptr[i + 1]
+            edges = zip(self.indices[start:stop].tolist(), self.lengths[start:stop].tolist())
+            lists.append([edge for edge in edges if edge[1] != math.inf])
+        return lists
+
+    def entries(self, a, b):
+        "CSR positions of the links from a to b."
+        start = self.indptr[a]
+        return start + np.flatnonzero(self.indices[start:self.indptr[a + 1]] == b)
+
+    def set_street_open(self, a, b, is_open):
+        """Close or reopen the street between a and b (both directions that exist).
+
+        Returns True if anything changed. Planners copy the neighbour lists
+        they search, so rebuild them (or invalidate them) afterwards.
+        """
+        changed = False
+        for u, v in ((a, b), (b, a)):
+            entries = self.entries(u, v)
+            if not len(entries):
+                continue
+            lengths = self.street_lengths[entries] if is_open else math.inf
+            if (self.lengths[entries] != lengths).any():
+                self.lengths[entries] = lengths
+                changed = True
+        if changed:
+            self._neighbor_lists = None
+        return changed
+
+    def path_points(self, nodes):
+        "Vector2D waypoints for a list of node ids."
+        points = self.points
+        return [points[i] for i in nodes]
+
+    def segments(self):
+        "(x1, y1, x2, y2) per two-way street, once each, for drawing."
+        lists = self.neighbor_lists()
+        xs, ys = self.xs.tolist(), self.ys.tolist()
+        return [
+            (xs[i], ys[i], xs[j], ys[j])
+            for i, row in enumerate(lists) for j in row
+            if j > i or i not in lists[j]
+        ]
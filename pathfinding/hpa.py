@@ -0,0 +1,249 @@
+import heapq
+import math
+
+import numpy as np
+
+
+class Cluster:
+    """One square cell of the hierarchy: its nodes, its entrances and the searches run inside it."""
+
+    def __init__(self, members):
+        self.members = members
+        self.member_set = set(members)
+        self.entrances = []
+        self.adjacent = set()  # clusters across the border
+        self.trees = {}  # source node -> (distance, parent) dicts of a search kept inside the cluster
+        self.edges = {}  # node -> its abstract edges (entrances of the cluster, border streets)
+
+
+class HierarchicalPlanner:
+    """HPA* over a WaypointGraph: plan between cluster entrances, refine one leg at a time.
+
+    Nodes are grouped into square clusters `cluster_size` world units wide.
+    Of the open streets across the border between two clusters, up to
+    `transitions` evenly spaced ones are kept (all of them with
+    transitions=None), and their ends are the entrances. The abstract
+    graph joins the entrances of a cluster by their shortest route inside
+    it, and each entrance to the one across its transition. The start
+    and goal join it the same way, through a search inside their own
+    cluster. abstract_path() runs A* over that graph and returns the nodes
+    a route passes through (start, entrances, goal), and refine() expands
+    one leg into node ids. A leg never leaves its cluster, so routes are
+    near-optimal rather than exact.
+
+    The in-cluster searches (entrance to entrance costs, and the trees legs
+    are refined from) and the abstract edges made from them are built the
+    first time a node is reached and kept per cluster; precompute() builds
+    them all up front. After streets open or close, invalidate(nodes) drops
+    only the clusters around those nodes.
+    """
+
+    def __init__(self, graph, cluster_size=1000, transitions=2):
+        if cluster_size <= 0:
+            raise ValueError(f"cluster_size must be positive, got {cluster_size!r}")
+        if transitions is not None and transitions < 1:
+            raise ValueError(f"transitions must be at least 1, got {transitions!r}")
+        self.graph = graph
+        self.cluster_size = cluster_size
+        self.transitions = transitions
+        self.xs = graph.xs.tolist()
+        self.ys = graph.ys.tolist()
+
+        cells = np.stack([np.floor(graph.xs / cluster_size), np.floor(graph.ys / cluster_size)], axis=1)
+        cells, cluster_of = np.unique(cells, axis=0, return_inverse=True)
+        self.cells = cells.tolist()
+        self.cluster_of = cluster_of.ravel().tolist()
+        members = [[] for _ in range(len(cells))]
+        for node, cluster in enumerate(self.cluster_of):
+            members[cluster].append(node)
+        self.clusters = [Cluster(nodes) for nodes in members]
+
+        self.neighbors = graph.edge_lists()
+        self.crossings = [[] for _ in range(len(graph))]  # (neighbour, length) of the transitions out of a node
+        for cluster in range(len(self.clusters)):
+            self._link(cluster)
+
+        # Stats for comparing planners
+        self.searches = 0
+        self.nodes_expanded = 0
+        self.last_expanded = 0
+        self.trees_built = 0
+        self.clusters_rebuilt = 0
+
+    def _link(self, index):
+        "Pick the transitions across each border of one cluster and find its entrances."
+        cluster_of = self.cluster_of
+        cluster = self.clusters[index]
+        borders = {}  # neighbouring cluster -> open streets (node, neighbour, length) into it
+        for node in cluster.members:
+            self.crossings[node] = []
+            for neighbor, length in self.neighbors[node]:
+                if cluster_of[neighbor] != index:
+                    borders.setdefault(cluster_of[neighbor], []).append((node, neighbor, length))
+        cluster.adjacent = set(borders)
+        xs, ys = self.xs, self.ys
+        for other, streets in borders.items():
+            if self.transitions is not None and len(streets) > self.transitions:
+                # Order along the border by street midpoint (ties by node ids), the same
+                # from both sides, so the two clusters keep the same streets
+                along_x = self.cells[other][0] == self.cells[index][0]
+                streets.sort(key=lambda street: (
+                    xs[street[0]] + xs[street[1]] if along_x else ys[street[0]] + ys[street[1]],
+                    min(street[0], street[1]), max(street[0], street[1]),
+                ))
+                last = len(streets) - 1
+                if self.transitions == 1:
+                    picks = {last // 2}
+                else:
+                    picks = {round(i * last / (self.transitions - 1)) for i in range(self.transitions)}
+                streets = [streets[i] for i in sorted(picks)]
+            for node, neighbor, length in streets:
+                self.crossings[node].append((neighbor, length))
+        cluster.entrances = [node for node in cluster.members if self.crossings[node]]
+
+    def tree(self, source):
+        "(distance, parent) of the shortest routes from source inside its cluster, searched once and kept."
+        cluster = self.clusters[self.cluster_of[source]]
+        tree = cluster.trees.get(source)
+        if tree is None:
+            tree = cluster.trees[source] = self._search(source, cluster.member_set)
+        return tree
+
+    def _search(self, source, members):
+        "Dijkstra from source over the streets between members."
+        distance = {source: 0.0}
+        parent = {source: -1}
+        heap = [(0.0, source)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > distance[node]:
+                continue
+            for neighbor, length in self.neighbors[node]:
+                if neighbor not in members:
+                    continue
+                tentative = cost + length
+                if tentative < distance.get(neighbor, math.inf):
+                    distance[neighbor] = tentative
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (tentative, neighbor))
+        self.trees_built += 1
+        return distance, parent
+
+    def abstract_edges(self, node, goal):
+        "(node, cost) pairs out of an abstract node: its cluster's entrances, the border, and the goal if it is there."
+        index = self.cluster_of[node]
+        cluster = self.clusters[index]
+        edges = cluster.edges.get(node)
+        if edges is None:
+            distance = self.tree(node)[0]
+            edges = [(entrance, distance[entrance]) for entrance in cluster.entrances
+                     if entrance != node and entrance in distance]
+            edges.extend(self.crossings[node])
+            cluster.edges[node] = edges
+        if goal != node and self.cluster_of[goal] == index:
+            distance = self.tree(node)[0]
+            if goal in distance:
+                return edges + [(goal, distance[goal])]
+        return edges
+
+    def abstract_path(self, start, end):
+        "Nodes a route from start to end passes through (start, entrances, end), or None if unreachable."
+        xs, ys = self.xs, self.ys
+        goal_x, goal_y = xs[end], ys[end]
+        g_score = {start: 0.0}
+        parent = {start: -1}
+        closed = set()
+        open_heap = [(math.hypot(goal_x - xs[start], goal_y - ys[start]), 0.0, start)]
+        expanded = 0
+        found = False
+
+        while open_heap:
+            _, g, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == end:
+                found = True
+                break
+            for neighbor, cost in self.abstract_edges(current, end):
+                if neighbor in closed:
+                    continue
+                tentative = g + cost
+                if tentative < g_score.get(neighbor, math.inf):
+                    g_score[neighbor] = tentative
+                    parent[neighbor] = current
+                    heuristic = math.hypot(goal_x - xs[neighbor], goal_y - ys[neighbor])
+                    heapq.heappush(open_heap, (tentative + heuristic, tentative, neighbor))
+
+        self.searches += 1
+        self.nodes_expanded += expanded
+        self.last_expanded = expanded
+        if not found:
+            return None
+
+        path = [end]
+        while path[-1] != start:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def refine(self, a, b):
+        "Node ids of the abstract leg a -> b inclusive, or None if it was cut since it was planned."
+        if self.cluster_of[a] != self.cluster_of[b]:
+            return [a, b]  # a border street
+        parent = self.tree(a)[1]
+        if b not in parent:
+            return None
+        path = [b]
+        while path[-1] != a:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return path
+
+    def path_ids(self, start, end):
+        "Every node id of the route from start to end, all legs refined, or None if unreachable."
+        route = self.abstract_path(start, end)
+        if route is None:
+            return None
+        path = [start]
+        for a, b in zip(route, route[1:]):
+            path.extend(self.refine(a, b)[1:])
+        return path
+
+    def precompute(self):
+        "Build every entrance's in-cluster search and abstract edges now instead of on first use."
+        for cluster in self.clusters:
+            for entrance in cluster.entrances:
+                self.abstract_edges(entrance, entrance)
+
+    def invalidate(self, nodes):
+        "Streets at these nodes opened or closed: re-read their links and rebuild only their clusters (and borders)."
+        nodes = sorted(set(nodes))
+        for node, edges in zip(nodes, self.graph.edge_lists(nodes)):
+            self.neighbors[node] = edges
+        touched = {self.cluster_of[node] for node in nodes}
+        bordering = set()
+        for index in touched:
+            bordering |= self.clusters[index].adjacent
+            self.clusters[index].trees = {}
+            self.clusters[index].edges = {}
+            self._link(index)
+            bordering |= self.clusters[index].adjacent
+        # Neighbours may pick other transitions into a touched cluster; their own searches still hold
+        for index in bordering - touched:
+            self.clusters[index].edges = {}
+            self._link(index)
+        self.clusters_rebuilt += len(touched)
+
+    def stats(self):
+        return {
+            "clusters": len(self.clusters),
+            "entrances": sum(len(cluster.entrances) for cluster in self.clusters),
+            "searches": self.searches,
+            "nodes_expanded": self.nodes_expanded,
+            "last_expanded": self.last_expanded,
+            "mean_expanded": self.nodes_expanded / self.searches if self.searches else 0.0,
+            "trees_built": self.trees_built,
+            "clusters_rebuilt": self.clusters_rebuilt,
+        }
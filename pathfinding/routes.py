@@ -0,0 +1,106 @@
+from array import array
+from collections import OrderedDict, deque
+
+
+class RouteTable:
+    """BFS routes over a static WaypointGraph, one predecessor row per source.
+
+    One BFS per source fills a predecessor row, so a route is a walk back
+    through the table instead of a fresh search. Each row is the BFS tree a
+    search from that source would build, so routes match bfs_find_path hop
+    for hop. Rows are filled the first time a route from their source is
+    asked for, and only the `max_rows` most recently used are kept, so
+    large generated cities cost nothing up front and bounded memory.
+    Routes are lists of node ids.
+    """
+
+    def __init__(self, graph, max_rows=2048):
+        self.graph = graph
+        self.neighbors = graph.neighbor_lists()
+        self.nodes_expanded = 0
+        self.max_rows = max_rows
+        self.predecessors = OrderedDict()
+
+    def row(self, source):
+        "The predecessor row of `source`, running its BFS on first use."
+        row = self.predecessors.get(source)
+        if row is None:
+            row = self.predecessors[source] = self._bfs(source)
+            if len(self.predecessors) > self.max_rows:
+                self.predecessors.popitem(last=False)
+        else:
+            self.predecessors.move_to_end(source)
+        return row
+
+    def _bfs(self, source):
+        row = array('l', [-1]) * len(self.graph)
+        row[source] = source
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            self.nodes_expanded += 1
+            for neighbor in self.neighbors[current]:
+                if row[neighbor] == -1:
+                    row[neighbor] = current
+                    queue.append(neighbor)
+        return row
+
+    def path_ids(self, start, end):
+        "Node ids from start to end inclusive, or None if end is unreachable."
+        row = self.row(start)
+        if row[end] == -1:
+            return None
+        path = [end]
+        while end != start:
+            end = row[end]
+            path.append(end)
+        path.reverse()
+        return path
+
+    def stats(self):
+        "BFS work happens once per source row; lookups expand no nodes."
+        return {"nodes": len(self.graph), "rows": len(self.predecessors), "nodes_expanded": self.nodes_expanded}
+
+
+class PathCache:
+    """Bounded LRU cache of full routes keyed by (start, end) node ids."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        "Return the cached path for key (moving it to most recent) or None."
+        path = self.entries.get(key)
+        if path is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return path
+
+    def put(self, key, path):
+        self.entries[key] = path
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
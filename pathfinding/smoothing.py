@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def smooth_path(path, visible):
+    """String pulling: drop the waypoints a straight line can skip.
+
+    From each kept point, walk ahead while the point after the next one is
+    still visible (visible(a, b) -> bool) and keep the last one that is.
+    The first and last points always stay, and nothing is added, so the
+    result is a sub-list of path.
+    """
+    if len(path) < 3:
+        return path
+    smoothed = [path[0]]
+    anchor = 0
+    last = len(path) - 1
+    while anchor < last:
+        reach = anchor + 1
+        while reach < last and visible(path[anchor], path[reach + 1]):
+            reach += 1
+        smoothed.append(path[reach])
+        anchor = reach
+    return smoothed
+
+
+class VisibilityMatrix:
+    """Precomputed line of sight between every pair of static waypoints.
+
+    matrix[i, j] says whether segment_clear(points[i], points[j]) holds on
+    the given obstacle map. visible(a, b) answers from the matrix when both
+    are the waypoint objects themselves (routes are built from them, so
+    they are found by identity, without hashing coordinates) and asks the
+    obstacle map otherwise (an NPC's own position, a victim). Building it
+    takes n * (n - 1) line-of-sight queries, so it is meant for small
+    static maps; larger ones raise ValueError. Build a new one when the
+    blocks change.
+    """
+
+    MAX_NODES = 512
+
+    def __init__(self, points, obstacles, max_nodes=MAX_NODES):
+        if len(points) > max_nodes:
+            raise ValueError(f"A visibility matrix over {len(points)} waypoints is too large (max_nodes={max_nodes})")
+        self.obstacles = obstacles
+        self.points = points  # keeps the objects (and so their ids) alive
+        self.index = {id(point): i for i, point in enumerate(points)}
+        count = len(points)
+        self.matrix = np.eye(count, dtype=bool)
+        clear = obstacles.segment_clear
+        for i, a in enumerate(points):
+            row = self.matrix[i]
+            for j, b in enumerate(points):
+                if i != j:
+                    row[j] = clear(a, b)
+        self.rows = self.matrix.tolist()  # plain lists for per-query lookups
+
+    def visible(self, a, b):
+        i = self.index.get(id(a))
+        j = self.index.get(id(b))
+        if i is None or j is None:
+            return self.obstacles.segment_clear(a, b)
+        return self.rows[i][j]
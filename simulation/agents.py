@@ -0,0 +1,149 @@
+import numpy as np
+
+
+class AgentStore:
+    """Struct-of-arrays storage for many agents.
+
+    Positions and velocities are (N, 2) float arrays, the limits and behavior
+    id are (N,) columns. Rows stay packed: removing an agent moves the last
+    row into the hole (swap-delete), so every array view covers exactly the
+    live agents. Callers keep the stable id returned by add(), not the row.
+    """
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.next_id = 0
+        self.index = {}
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity):
+        old = self.count
+        positions = np.zeros((capacity, 2))
+        velocities = np.zeros((capacity, 2))
+        max_speed = np.zeros(capacity)
+        max_force = np.zeros(capacity)
+        behavior = np.zeros(capacity, dtype=np.int32)
+        ids = np.zeros(capacity, dtype=np.int64)
+        if old:
+            positions[:old] = self._positions[:old]
+            velocities[:old] = self._velocities[:old]
+            max_speed[:old] = self._max_speed[:old]
+            max_force[:old] = self._max_force[:old]
+            behavior[:old] = self._behavior[:old]
+            ids[:old] = self._ids[:old]
+        self._positions = positions
+        self._velocities = velocities
+        self._max_speed = max_speed
+        self._max_force = max_force
+        self._behavior = behavior
+        self._ids = ids
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, agent_id):
+        return agent_id in self.index
+
+    # Views over the live rows; writes go straight into the store
+    @property
+    def positions(self):
+        return self._positions[:self.count]
+
+    @property
+    def velocities(self):
+        return self._velocities[:self.count]
+
+    @property
+    def max_speed(self):
+        return self._max_speed[:self.count]
+
+    @property
+    def max_force(self):
+        return self._max_force[:self.count]
+
+    @property
+    def behavior(self):
+        return self._behavior[:self.count]
+
+    @property
+    def ids(self):
+        return self._ids[:self.count]
+
+    def add(self, position, velocity=(0, 0), max_speed=1.0, max_force=1.0, behavior=0):
+        "Append an agent and return its stable id."
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        row = self.count
+        self._positions[row] = position
+        self._velocities[row] = velocity
+        self._max_speed[row] = max_speed
+        self._max_force[row] = max_force
+        self._behavior[row] = behavior
+        agent_id = self.next_id
+        self.next_id += 1
+        self._ids[row] = agent_id
+        self.index[agent_id] = row
+        self.count += 1
+        return agent_id
+
+    def remove(self, agent_id):
+        "Remove an agent by swapping the last row into its slot."
+        row = self.index.pop(agent_id)
+        last = self.count - 1
+        if row != last:
+            self._positions[row] = self._positions[last]
+            self._velocities[row] = self._velocities[last]
+            self._max_speed[row] = self._max_speed[last]
+            self._max_force[row] = self._max_force[last]
+            self._behavior[row] = self._behavior[last]
+            moved_id = int(self._ids[last])
+            self._ids[row] = moved_id
+            self.index[moved_id] = row
+        self.count = last
+
+    def row_of(self, agent_id):
+        return self.index[agent_id]
+
+    def clear(self):
+        self.count = 0
+        self.index = {}
+
+    def integrate(self, steering, dt=1.0, bounds=None, edge_mode="bounce", restitution=0.5):
+        """Advance every agent one tick.
+
+        Adds the (N, 2) steering to the velocities, clamps each speed to its
+        max_speed (same arithmetic as Vector2D.clamp_length_ip) and moves by
+        velocity * dt. With bounds=(width, height) agents either bounce off
+        the edges, losing speed by `restitution`, or wrap around them.
+        """
+        count = self.count
+        if count == 0:
+            return
+        velocities = self._velocities[:count]
+        positions = self._positions[:count]
+        max_speed = self._max_speed[:count]
+
+        velocities += steering
+        speed_sq = velocities[:, 0] * velocities[:, 0] + velocities[:, 1] * velocities[:, 1]
+        too_fast = speed_sq > max_speed * max_speed
+        if too_fast.any():
+            speed = np.sqrt(speed_sq[too_fast])
+            velocities[too_fast] = velocities[too_fast] / speed[:, None] * max_speed[too_fast, None]
+
+        positions += velocities * dt
+
+        if bounds is None:
+            return
+        limits = np.asarray(bounds, dtype=float)
+        if edge_mode == "wrap":
+            np.mod(positions, limits, out=positions)
+        elif edge_mode == "bounce":
+            for axis in (0, 1):
+                column = positions[:, axis]
+                outside = (column < 0) | (column > limits[axis])
+                if outside.any():
+                    np.clip(column, 0, limits[axis], out=column)
+                    velocities[outside, axis] *= -restitution
+        else:
+            raise ValueError(f"Unknown edge_mode {edge_mode!r}, expected 'bounce' or 'wrap'")
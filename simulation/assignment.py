@@ -0,0 +1,108 @@
+import numpy as np
+
+
+def solve_assignment(cost):
+    """Minimum-cost assignment (Hungarian / Kuhn-Munkres) for a cost matrix.
+
+    `cost` is (rows, cols) and may be rectangular; every row is matched when
+    rows <= cols, otherwise every column is. Returns a list of (row, col)
+    pairs. The inner scan over columns is vectorized, so one solve is
+    O(rows^2) NumPy passes over the columns.
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return []
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    rows, cols = cost.shape
+
+    # 1-based potentials and matching as in the classic formulation; column 0 is a sentinel
+    u = np.zeros(rows + 1)
+    v = np.zeros(cols + 1)
+    match = np.zeros(cols + 1, dtype=np.int64)
+    way = np.zeros(cols + 1, dtype=np.int64)
+
+    for row in range(1, rows + 1):
+        match[0] = row
+        j0 = 0
+        minv = np.full(cols + 1, np.inf)
+        used = np.zeros(cols + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            free = ~used[1:]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            used_cols = np.flatnonzero(used)
+            u[match[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # Flip the augmenting path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    pairs = [(int(match[col]) - 1, col - 1) for col in range(1, cols + 1) if match[col]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
+def distance_matrix(sources, targets):
+    "(len(sources), len(targets)) straight-line distances between two lists of Vector2D."
+    a = np.array([(p.x, p.y) for p in sources], dtype=float).reshape(-1, 2)
+    b = np.array([(p.x, p.y) for p in targets], dtype=float).reshape(-1, 2)
+    delta = b[None, :, :] - a[:, None, :]
+    return np.sqrt(delta[:, :, 0] * delta[:, :, 0] + delta[:, :, 1] * delta[:, :, 1])
+
+
+class VictimAssigner:
+    """Keeps the NPC -> victim claims and fills them in batches.
+
+    Claims are keyed by victim id. Only NPCs that have no claim take part
+    in a solve, so losing a victim to the player or another NPC re-plans
+    just the NPC that had claimed it.
+    """
+
+    def __init__(self):
+        self.claims = {}
+        self.solves = 0
+
+    def clear(self):
+        self.claims = {}
+
+    def claimant(self, victim):
+        return self.claims.get(victim)
+
+    def release(self, victim):
+        "Drop the claim on a victim and return the NPC that held it, if any."
+        return self.claims.pop(victim, None)
+
+    def assign(self, npcs, victims):
+        """Assign free victims to the given idle NPCs.
+
+        `victims` maps victim id -> position (a VictimStore); returns
+        {npc: victim id}.
+        """
+        free = [victim for victim in victims if victim not in self.claims]
+        if not npcs or not free:
+            return {}
+        self.solves += 1
+        cost = distance_matrix([npc.pos for npc in npcs], [victims[victim] for victim in free])
+        result = {}
+        for row, col in solve_assignment(cost):
+            npc = npcs[row]
+            victim = free[col]
+            self.claims[victim] = npc
+            result[npc] = victim
+        return result
@@ -0,0 +1,113 @@
+import time
+
+
+class Engine:
+    """Drives a headless world one fixed tick at a time, as fast as the CPU allows.
+
+    A world only needs step(), snapshot() and a tick counter; is_finished()
+    is optional and lets run() stop on its own.
+    """
+
+    def __init__(self, world):
+        self.world = world
+
+    @property
+    def tick(self):
+        return self.world.tick
+
+    def step(self, n=1):
+        "Advance the world by n ticks and return the new tick count."
+        for _ in range(n):
+            self.world.step()
+        return self.world.tick
+
+    def is_finished(self):
+        is_finished = getattr(self.world, "is_finished", None)
+        return bool(is_finished and is_finished())
+
+    def run(self, max_ticks=None, every=1):
+        """Step until the world finishes or max_ticks is reached.
+
+        Yields a snapshot every `every` ticks (and always the last one).
+        """
+        start = self.world.tick
+        while not self.is_finished():
+            if max_ticks is not None and self.world.tick - start >= max_ticks:
+                break
+            self.world.step()
+            if (self.world.tick - start) % every == 0:
+                yield self.world.snapshot()
+        if (self.world.tick - start) % every != 0:
+            yield self.world.snapshot()
+
+
+class FixedStepClock:
+    """Fixed-timestep accumulator for the Tk viewers.
+
+    Each rendered frame calls advance(), which adds the real time since the
+    previous frame (times the fast-forward speed) to an accumulator and
+    returns how many whole ticks of `tick_seconds` are due. The simulation
+    therefore runs at the same rate however slowly or unevenly frames are
+    drawn. alpha is the fraction of a tick left over, for drawing positions
+    part of the way between the last two ticks.
+
+    At most `max_steps` ticks run per frame. When the simulation cannot
+    keep up (or a frame stalls), the rest of the backlog is dropped instead
+    of piling up, so a slow machine runs slower rather than freezing.
+    """
+
+    SPEEDS = (1, 10, 100)
+
+    def __init__(self, tick_seconds, max_steps=250, clock=time.perf_counter):
+        self.tick_seconds = tick_seconds
+        self.max_steps = max_steps
+        self.clock = clock
+        self.speed = 1
+        self.accumulator = 0.0
+        self.last = None
+        self.dropped = 0  # ticks skipped by the max_steps cap
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.tick_seconds, 1.0)
+
+    def reset(self):
+        "Forget the time since the last frame, e.g. after a pause."
+        self.last = None
+        self.accumulator = 0.0
+
+    def set_speed(self, speed):
+        if speed <= 0:
+            raise ValueError(f"Speed must be positive, got {speed!r}")
+        self.speed = speed
+
+    def cycle_speed(self):
+        "Switch to the next of SPEEDS (1x, 10x, 100x, then back to 1x) and return it."
+        speeds = self.SPEEDS
+        following = [speed for speed in speeds if speed > self.speed]
+        self.set_speed(following[0] if following else speeds[0])
+        return self.speed
+
+    def advance(self):
+        "Number of ticks to run this frame."
+        now = self.clock()
+        if self.last is None:
+            self.last = now
+            return 0
+        self.accumulator += (now - self.last) * self.speed
+        self.last = now
+        steps = int(self.accumulator // self.tick_seconds)
+        if steps > self.max_steps:
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.tick_seconds
+        return steps
+
+
+def lerp(previous, current, alpha):
+    "Vector2D part of the way from previous to current (current itself when alpha is 1)."
+    if alpha >= 1.0 or previous is None:
+        return current
+    return previous + (current - previous) * alpha
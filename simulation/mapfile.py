@@ -0,0 +1,190 @@
+"""Binary map files, opened through one read-only memory map.
+
+A map file holds everything RescueWorld builds in setup_city(),
+setup_waypoints() and create_hospitals(), as fixed-dtype little-endian
+arrays:
+
+    blocks       (B, 4) <f8  x, y, width, height
+    waypoints    (N, 2) <f8  street crossings
+    indptr       (N+1,) <i8  CSR adjacency: the neighbours of waypoint i are
+    indices      (E,)   <i4  indices[indptr[i]:indptr[i + 1]], in graph order
+    hospitals    (H, 2) <f8
+    spawn_zones  (Z, 4) <f8  min x, min y, max x, max y of victim spawn areas
+
+Layout: 8-byte magic, u32 format version, u32 header length, a JSON header
+(array dtypes, shapes and offsets plus free-form metadata), then the
+arrays, each starting on a 64-byte boundary. MapFile maps the file
+once and views the arrays in place, so opening even a huge map only reads
+the header, and processes opening the same file share its pages through
+the OS page cache.
+
+    python -m simulation.mapfile save builtin.map
+    python -m simulation.mapfile save city.map --city 100 100 --park-ratio 0.1
+    python -m simulation.mapfile info city.map
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from pathfinding.graph import WaypointGraph
+from simulation.citygen import generate_city
+from simulation.rescue_world import RescueWorld
+from vector import Vector2D
+
+MAGIC = b"RSCUEMAP"
+FORMAT_VERSION = 1
+ALIGN = 64
+PREFIX = struct.Struct("<8sII")
+
+ARRAYS = {
+    "blocks": "<f8",
+    "waypoints": "<f8",
+    "indptr": "<i8",
+    "indices": "<i4",
+    "hospitals": "<f8",
+    "spawn_zones": "<f8",
+}
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def map_arrays(blocks, graph, hospitals, spawn_zones):
+    "The map arrays for world-style data: block dicts, a WaypointGraph, hospitals, zones."
+    return {
+        "blocks": np.array([(b['x'], b['y'], b['width'], b['height']) for b in blocks], dtype="<f8").reshape(-1, 4),
+        "waypoints": np.stack([graph.xs, graph.ys], axis=1).astype("<f8"),
+        "indptr": graph.indptr.astype("<i8"),
+        "indices": graph.indices.astype("<i4"),
+        "hospitals": np.array([(h.x, h.y) for h in hospitals], dtype="<f8").reshape(-1, 2),
+        "spawn_zones": np.array(spawn_zones, dtype="<f8").reshape(-1, 4),
+    }
+
+
+def write_map(path, arrays, meta=None):
+    "Write map arrays (see ARRAYS) to path, through a temporary file so readers never see half of it."
+    entries = {name: np.ascontiguousarray(arrays[name], dtype=dtype) for name, dtype in ARRAYS.items()}
+    header = {"arrays": {}, "meta": meta or {}}
+    offset = 0
+    for name, array in entries.items():
+        offset = _aligned(offset)
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode()
+    data_start = _aligned(PREFIX.size + len(header_bytes))
+
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "wb") as handle:
+        handle.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        handle.write(header_bytes)
+        for name, array in entries.items():
+            handle.write(b"\0" * (data_start + header["arrays"][name]["offset"] - handle.tell()))
+            handle.write(array.tobytes())
+    os.replace(partial, path)
+
+
+def save_map(path, world, meta=None):
+    "Save a RescueWorld's map (blocks, waypoints, street graph, hospitals, spawn zones)."
+    arrays = map_arrays(world.city_blocks, world.graph, world.hospitals, world.spawn_zones)
+    write_map(path, arrays, meta)
+
+
+class MapFile:
+    """Read-only, memory-mapped map.
+
+    The arrays named in ARRAYS are NumPy views straight into the mapping.
+    A MapFile can be passed to RescueWorld(city=...) like a generated
+    City; the world then copies out the Python objects it works with.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self.mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_length = PREFIX.unpack_from(self.mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a map file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported map file version {version}")
+        header = json.loads(self.mmap[PREFIX.size:PREFIX.size + header_length])
+        self.meta = header["meta"]
+        data_start = _aligned(PREFIX.size + header_length)
+        for name in ARRAYS:
+            entry = header["arrays"][name]
+            shape = tuple(entry["shape"])
+            count = int(np.prod(shape))
+            if count:
+                array = np.frombuffer(self.mmap, dtype=entry["dtype"], count=count,
+                                      offset=data_start + entry["offset"]).reshape(shape)
+            else:
+                array = np.zeros(shape, dtype=entry["dtype"])
+            setattr(self, name, array)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def close(self):
+        "Drop the arrays and unmap the file (fails while views into it are still referenced elsewhere)."
+        for name in ARRAYS:
+            setattr(self, name, None)
+        self.mmap.close()
+
+    def neighbors(self, index):
+        "Waypoint ids adjacent to waypoint `index`, in graph order."
+        return self.indices[self.indptr[index]:self.indptr[index + 1]]
+
+    def block_dicts(self):
+        return [
+            {'x': x, 'y': y, 'width': width, 'height': height}
+            for x, y, width, height in self.blocks.tolist()
+        ]
+
+    def waypoint_graph(self):
+        "The street graph as a WaypointGraph, copied out of the mapping so the file can be closed."
+        return WaypointGraph(self.waypoints[:, 0], self.waypoints[:, 1], self.indptr.copy(), self.indices.copy())
+
+    def hospital_positions(self):
+        return [Vector2D(x, y) for x, y in self.hospitals.tolist()]
+
+    def spawn_bounds(self):
+        return [tuple(zone) for zone in self.spawn_zones.tolist()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulation.mapfile")
+    commands = parser.add_subparsers(dest="command", required=True)
+    save = commands.add_parser("save", help="write the built-in map, or a generated city, to a map file")
+    save.add_argument("path")
+    save.add_argument("--city", type=int, nargs=2, metavar=("COLS", "ROWS"), help="generate a city of this many blocks")
+    save.add_argument("--jitter", type=float, default=0.0)
+    save.add_argument("--park-ratio", type=float, default=0.0)
+    save.add_argument("--seed", type=int, default=0)
+    info = commands.add_parser("info", help="summarize a map file")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "save":
+        city, meta = None, {"source": "builtin"}
+        if args.city:
+            city = generate_city(*args.city, jitter=args.jitter, park_ratio=args.park_ratio, seed=args.seed)
+            meta = {"source": "citygen", "params": city.params}
+        save_map(args.path, RescueWorld(0, city=city), meta)
+    with MapFile(args.path) as map_file:
+        print(f"{args.path}: {len(map_file.blocks)} blocks, {len(map_file.waypoints)} waypoints, "
+              f"{len(map_file.indices)} street links, {len(map_file.hospitals)} hospitals, "
+              f"{len(map_file.spawn_zones)} spawn zones ({map_file.meta.get('source', 'unknown')})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameProfiler:
+    """Per-phase frame timings and per-frame counters.
+
+    A viewer calls begin_frame()/end_frame() around each update and wraps
+    its own phases in `with profiler.phase("draw"):`. attach(world) wraps the
+    methods a world lists in PROFILED_PHASES (timed) and PROFILED_COUNTERS
+    (counted) on that instance only, and detach() puts them back, so a world
+    that is not being profiled runs its original methods untouched.
+
+    Phase times are inclusive: a path query made from update_npc counts
+    towards the "npcs" phase too. Only the last `window` frames are kept.
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self.frames = deque(maxlen=window)
+        self.frame_count = 0
+        self.current = None
+        self.frame_start = None
+        self.last_start = None
+        self.wrapped = []
+
+    # -- frames --------------------------------------------------------------
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self.current = {
+            "frame": self.frame_count,
+            "interval": now - self.last_start if self.last_start is not None else 0.0,
+            "phases": {},
+            "counters": {},
+        }
+        self.last_start = now
+        self.frame_start = now
+
+    def end_frame(self):
+        "Close the current frame; returns its record."
+        frame = self.current
+        if frame is None:
+            return None
+        frame["total"] = time.perf_counter() - self.frame_start
+        self.frames.append(frame)
+        self.frame_count += 1
+        self.current = None
+        return frame
+
+    def add_time(self, phase, seconds):
+        if self.current is not None:
+            phases = self.current["phases"]
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def count(self, counter, n=1):
+        if self.current is not None:
+            counters = self.current["counters"]
+            counters[counter] = counters.get(counter, 0) + n
+
+    def phase(self, name):
+        "Context manager adding the time spent inside it to a phase of the current frame."
+        return _PhaseTimer(self, name)
+
+    # -- attaching to a world ------------------------------------------------
+
+    def time_calls(self, obj, method_name, phase):
+        "Wrap obj.method_name so every call adds its duration to `phase`."
+        original = getattr(obj, method_name)
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.add_time(phase, perf_counter() - start)
+
+        self._wrap(obj, method_name, timed)
+
+    def count_calls(self, obj, method_name, counter):
+        "Wrap obj.method_name so every call bumps `counter`."
+        original = getattr(obj, method_name)
+
+        def counted(*args, **kwargs):
+            self.count(counter)
+            return original(*args, **kwargs)
+
+        self._wrap(obj, method_name, counted)
+
+    def _wrap(self, obj, method_name, wrapper):
+        setattr(obj, method_name, wrapper)
+        self.wrapped.append((obj, method_name, wrapper))
+
+    def attach(self, world):
+        "Instrument the phases and counters a world declares."
+        for method_name, phase in getattr(world, "PROFILED_PHASES", {}).items():
+            self.time_calls(world, method_name, phase)
+        for method_name, counter in getattr(world, "PROFILED_COUNTERS", {}).items():
+            self.count_calls(world, method_name, counter)
+        return self
+
+    def detach(self):
+        "Restore every wrapped method, newest first."
+        while self.wrapped:
+            obj, method_name, wrapper = self.wrapped.pop()
+            if obj.__dict__.get(method_name) is wrapper:
+                delattr(obj, method_name)
+
+    # -- reporting -----------------------------------------------------------
+
+    def series(self, name):
+        "Seconds per frame for 'total', 'interval' or a phase over the window."
+        if name in ("total", "interval"):
+            return np.array([frame[name] for frame in self.frames])
+        return np.array([frame["phases"].get(name, 0.0) for frame in self.frames])
+
+    def phase_names(self):
+        names = []
+        for frame in self.frames:
+            for name in frame["phases"]:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def counter_names(self):
+        names = []
+        for frame in self.frames:
+            for name in frame["counters"]:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def percentiles(self, name):
+        "p50/p95/p99, mean and max in milliseconds for one series."
+        values = self.series(name) * 1000.0
+        if len(values) == 0:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            "p50": float(p50), "p95": float(p95), "p99": float(p99),
+            "mean": float(values.mean()), "max": float(values.max()),
+        }
+
+    def summary(self):
+        "Percentiles for the frame total, the interval and each phase, plus mean counters per frame."
+        frames = len(self.frames)
+        return {
+            "frames": frames,
+            "total": self.percentiles("total"),
+            "interval": self.percentiles("interval"),
+            "phases": {name: self.percentiles(name) for name in self.phase_names()},
+            "counters": {
+                name: sum(frame["counters"].get(name, 0) for frame in self.frames) / frames
+                for name in self.counter_names()
+            },
+        }
+
+    def overlay_lines(self):
+        "Short text lines for an on-canvas overlay."
+        summary = self.summary()
+        total = summary["total"]
+        lines = [
+            f"frame  p50 {total['p50']:.2f}  p95 {total['p95']:.2f}  p99 {total['p99']:.2f} ms",
+            f"interval p50 {summary['interval']['p50']:.1f} ms",
+        ]
+        for name, stats in summary["phases"].items():
+            lines.append(f"{name:<8} p50 {stats['p50']:.2f}  p99 {stats['p99']:.2f} ms")
+        for name, mean in summary["counters"].items():
+            lines.append(f"{name:<16} {mean:.1f}/frame")
+        return lines
+
+    def export_json(self, path):
+        with open(path, "w") as handle:
+            json.dump({"summary": self.summary(), "frames": list(self.frames)}, handle, indent=2)
+
+    def export_csv(self, path):
+        "One row per frame: times in milliseconds, then the counters."
+        phases = self.phase_names()
+        counters = self.counter_names()
+        with open(path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["frame", "total_ms", "interval_ms"] + [f"{p}_ms" for p in phases] + counters)
+            for frame in self.frames:
+                writer.writerow(
+                    [frame["frame"], frame["total"] * 1000.0, frame["interval"] * 1000.0]
+                    + [frame["phases"].get(p, 0.0) * 1000.0 for p in phases]
+                    + [frame["counters"].get(c, 0) for c in counters]
+                )
+
+
+class _PhaseTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
@@ -0,0 +1,367 @@
+"""Record a RescueWorld run to disk and replay it without re-simulating.
+
+A recording is a directory of flat binary tables of NumPy structured
+records plus a small meta.json:
+
+    frames.bin            one FRAME_DTYPE record per captured tick
+    agents.bin            AGENT_DTYPE rows, per frame the NPCs in order then the player
+    events.bin            EVENT_DTYPE records (reset, spawn, pickup, delivery)
+    keyframes.bin         one KEYFRAME_DTYPE record every `keyframe_frames` frames
+    keyframe_victims.bin  VICTIM_DTYPE rows, per keyframe the victims waiting then
+
+Frames point into the agent and event tables by offset, so looking up any
+frame is O(1). The victims waiting at a frame are the ones of the keyframe
+before it plus the few events in between, so scrubbing anywhere costs at
+most `keyframe_frames` frames of events. The recorder appends to the tables in chunks while the run goes
+on; TrajectoryReplay memory-maps them, so opening even a very long
+recording reads only the pages that are actually looked at.
+
+    python -m simulation.recording record run.rec --ticks 100000 --seed 1
+    python -m simulation.recording info run.rec
+    python mainLab02.py --replay run.rec
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from simulation.citygen import GENERATOR_VERSION, City, load_city
+from simulation.mapfile import MapFile
+from simulation.rescue_world import EVENT_KINDS, PLAYER, RescueSnapshot, RescueWorld
+
+FORMAT_VERSION = 3
+NPC_STATES = ("searching", "delivering")
+NO_AGENT = -2  # event agent for map events (reset, spawn)
+NO_VICTIM = -1  # event victim for resets and deliveries
+
+FRAME_DTYPE = np.dtype([
+    ("tick", "<i8"),
+    ("agent_start", "<i8"),
+    ("agent_count", "<i4"),
+    ("event_end", "<i8"),  # events[:event_end] happened up to and including this frame
+    ("rescued", "<i4"),
+])
+AGENT_DTYPE = np.dtype([
+    ("x", "<f4"), ("y", "<f4"),
+    ("vx", "<f4"), ("vy", "<f4"),
+    ("state", "u1"),
+    ("carrying", "u1"),
+])
+EVENT_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("kind", "u1"),
+    ("agent", "<i2"),
+    ("victim", "<i8"),  # the world's victim id (VictimStore)
+    ("x", "<f4"), ("y", "<f4"),
+])
+KEYFRAME_DTYPE = np.dtype([
+    ("frame", "<i8"),
+    ("victim_start", "<i8"),
+    ("victim_count", "<i4"),
+])
+VICTIM_DTYPE = np.dtype([
+    ("id", "<i8"),
+    ("x", "<f4"), ("y", "<f4"),
+])
+TABLES = {
+    "frames": FRAME_DTYPE,
+    "agents": AGENT_DTYPE,
+    "events": EVENT_DTYPE,
+    "keyframes": KEYFRAME_DTYPE,
+    "keyframe_victims": VICTIM_DTYPE,
+}
+
+
+def map_source(world):
+    """Where the world's map came from, as stored in meta.json.
+
+    {"source": "builtin"}, {"source": "citygen", "params": {...}} or
+    {"source": "mapfile", "path": ...}, plus the block and waypoint counts
+    so a replay can tell a rebuilt map that does not match.
+    """
+    city = world.city
+    if city is None:
+        source = {"source": "builtin"}
+    elif isinstance(city, City):
+        source = {"source": "citygen", "params": city.params}
+    elif isinstance(city, MapFile):
+        source = {"source": "mapfile", "path": os.path.abspath(city.path)}
+    else:
+        source = {"source": "unknown"}
+    source["blocks"] = len(world.city_blocks)
+    source["waypoints"] = len(world.waypoints)
+    return source
+
+
+class TrajectoryRecorder:
+    """Captures one frame of a RescueWorld per capture() call.
+
+    Call capture() after every world.step(). Pickups, deliveries and
+    victim spawns are picked up through the world's listeners, and every
+    `keyframe_frames` frames the waiting victims are written out whole.
+    Buffers are written out every `chunk_frames` frames and on close().
+    """
+
+    def __init__(self, path, world, chunk_frames=4096, keyframe_frames=256):
+        if keyframe_frames < 1:
+            raise ValueError(f"keyframe_frames must be at least 1, got {keyframe_frames!r}")
+        self.path = path
+        self.world = world
+        self.chunk_frames = chunk_frames
+        self.keyframe_frames = keyframe_frames
+        os.makedirs(path, exist_ok=True)
+        self.files = {name: open(os.path.join(path, f"{name}.bin"), "wb") for name in TABLES}
+        self.counts = {name: 0 for name in TABLES}
+        self.rows = {name: [] for name in TABLES}
+        self.frames = self.rows["frames"]
+        self.agents = self.rows["agents"]
+        self.events = self.rows["events"]
+        self.event_total = 0
+        self.map = map_source(world)
+
+        # The recording starts from the world as it is now
+        world.listeners.append(self.on_event)
+        self.on_event("reset", None, None, None)
+        for victim, position in world.victims.items():
+            self.on_event("spawn", None, position, victim)
+        self.capture()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def on_event(self, kind, agent, position, victim):
+        # Events raised during a step belong to the frame captured after it
+        x, y = (position.x, position.y) if position is not None else (0.0, 0.0)
+        self.events.append((
+            self.counts["frames"] + len(self.frames),
+            EVENT_KINDS.index(kind),
+            NO_AGENT if agent is None else agent,
+            NO_VICTIM if victim is None else victim,
+            x, y,
+        ))
+        self.event_total += 1
+
+    def capture(self):
+        "Record the world's current state as the next frame."
+        world = self.world
+        index = self.counts["frames"] + len(self.frames)
+        if index % self.keyframe_frames == 0:
+            victims = self.rows["keyframe_victims"]
+            victim_start = self.counts["keyframe_victims"] + len(victims)
+            self.rows["keyframes"].append((index, victim_start, len(world.victims)))
+            victims.extend((victim, position.x, position.y) for victim, position in world.victims.items())
+        agent_start = self.counts["agents"] + len(self.agents)
+        for npc in world.npcs:
+            self.agents.append((
+                npc.pos.x, npc.pos.y, npc.vel.x, npc.vel.y,
+                NPC_STATES.index(npc.state), npc.carrying_victim is not None,
+            ))
+        self.agents.append((
+            world.player_pos.x, world.player_pos.y, world.player_vel.x, world.player_vel.y,
+            0, world.player_carrying_victim is not None,
+        ))
+        self.frames.append((world.tick, agent_start, len(world.npcs) + 1, self.event_total, world.rescued_count))
+        if len(self.frames) >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        for name, rows in self.rows.items():
+            if rows:
+                self.files[name].write(np.array(rows, dtype=TABLES[name]).tobytes())
+                self.counts[name] += len(rows)
+                rows.clear()
+
+    def close(self):
+        if self.files is None:
+            return
+        self.flush()
+        for handle in self.files.values():
+            handle.close()
+        self.files = None
+        if self.on_event in self.world.listeners:
+            self.world.listeners.remove(self.on_event)
+        world = self.world
+        meta = {
+            "version": FORMAT_VERSION,
+            "counts": self.counts,
+            "dtypes": {name: dtype.descr for name, dtype in TABLES.items()},
+            "npc_states": list(NPC_STATES),
+            "event_kinds": list(EVENT_KINDS),
+            "keyframe_frames": self.keyframe_frames,
+            "seed": world.seed,
+            "victim_count": world.victim_count,
+            "npc_count": world.npc_count,
+            "planner": world.planner,
+            "map": self.map,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as handle:
+            json.dump(meta, handle, indent=2)
+
+
+class TrajectoryReplay:
+    """Read-only, memory-mapped view of a recording.
+
+    frame(i) rebuilds a RescueSnapshot for any frame index; the raw tables
+    (frames, agents, events, keyframes, keyframe_victims) are there for
+    whole-run analysis with NumPy.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as handle:
+            self.meta = json.load(handle)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version {self.meta['version']}")
+        for name, dtype in TABLES.items():
+            count = self.meta["counts"][name]
+            if count:
+                table = np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=(count,))
+            else:
+                table = np.zeros(0, dtype=dtype)
+            setattr(self, name, table)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def build_world(self):
+        """An empty RescueWorld on the recorded map, for restoring frames into.
+
+        Raises ValueError when that map cannot be rebuilt (an unknown source,
+        a city from another generator version) or no longer matches the
+        recording (a map file that was changed since).
+        """
+        source = self.meta["map"]
+        if source["source"] == "builtin":
+            city = None
+        elif source["source"] == "citygen":
+            params = dict(source["params"])
+            if params.pop("version") != GENERATOR_VERSION:
+                raise ValueError("The recorded city was built by another city generator version")
+            city = load_city(params.pop("cols"), params.pop("rows"), **params)
+        elif source["source"] == "mapfile":
+            city = MapFile(source["path"])
+        else:
+            raise ValueError(f"Cannot rebuild the recorded map (source {source['source']!r})")
+        try:
+            world = RescueWorld(0, npc_count=self.meta["npc_count"], city=city)
+        finally:
+            if isinstance(city, MapFile):
+                city.close()
+        if (len(world.city_blocks), len(world.waypoints)) != (source["blocks"], source["waypoints"]):
+            raise ValueError(f"The {source['source']} map does not match the recording "
+                             f"({len(world.city_blocks)} blocks, {len(world.waypoints)} waypoints; "
+                             f"recorded {source['blocks']} and {source['waypoints']})")
+        return world
+
+    def agent_rows(self, index):
+        frame = self.frames[index]
+        start = int(frame["agent_start"])
+        return self.agents[start:start + int(frame["agent_count"])]
+
+    def events_until(self, index):
+        "Every event up to and including frame `index`."
+        return self.events[:int(self.frames[index]["event_end"])]
+
+    def victims_at(self, index):
+        "Victim positions waiting for pickup at frame `index`, in spawn order: the keyframe before it plus the events since."
+        key = self.keyframes[index // self.meta["keyframe_frames"]]
+        start = int(key["victim_start"])
+        rows = self.keyframe_victims[start:start + int(key["victim_count"])]
+        victims = dict(zip(rows["id"].tolist(), zip(rows["x"].tolist(), rows["y"].tolist())))
+        events = self.events[int(self.frames[int(key["frame"])]["event_end"]):int(self.frames[index]["event_end"])]
+        reset, spawn, pickup = (EVENT_KINDS.index(kind) for kind in ("reset", "spawn", "pickup"))
+        for kind, victim, x, y in zip(events["kind"].tolist(), events["victim"].tolist(),
+                                      events["x"].tolist(), events["y"].tolist()):
+            if kind == spawn:
+                victims[victim] = (x, y)
+            elif kind == pickup:
+                victims.pop(victim, None)
+            elif kind == reset:
+                victims.clear()
+        return tuple(victims.values())
+
+    def frame(self, index):
+        "The recorded state at frame `index` as a RescueSnapshot (float32 precision)."
+        record = self.frames[index]
+        rows = self.agent_rows(index)
+        npcs, player = rows[:-1], rows[-1]
+        return RescueSnapshot(
+            int(record["tick"]),
+            tuple(NPC_STATES[state] for state in npcs["state"].tolist()),
+            tuple(zip(npcs["x"].tolist(), npcs["y"].tolist())),
+            tuple(zip(npcs["vx"].tolist(), npcs["vy"].tolist())),
+            (float(player["x"]), float(player["y"])),
+            (float(player["vx"]), float(player["vy"])),
+            self.victims_at(index),
+            int(record["rescued"]),
+            bool(player["carrying"]),
+        )
+
+    def track(self, agent):
+        """(frames, 2) positions of one agent over the whole run.
+
+        agent is an NPC index or PLAYER; assumes the fleet size did not
+        change during the recording.
+        """
+        counts = self.frames["agent_count"]
+        offset = counts - 1 if agent == PLAYER else agent
+        rows = self.agents[self.frames["agent_start"] + offset]
+        return np.stack([rows["x"], rows["y"]], axis=1)
+
+
+def record_run(path, ticks, **world_kwargs):
+    "Run a fresh headless RescueWorld for `ticks` ticks (or until it finishes), recording every tick."
+    world = RescueWorld(**world_kwargs)
+    with TrajectoryRecorder(path, world) as recorder:
+        for _ in range(ticks):
+            if world.is_finished():
+                break
+            world.step()
+            recorder.capture()
+    return world
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulation.recording")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="run a headless episode and record it")
+    record.add_argument("path")
+    record.add_argument("--ticks", type=int, default=10000)
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--victims", type=int, default=8)
+    record.add_argument("--npcs", type=int, default=1)
+    record.add_argument("--planner", choices=RescueWorld.PLANNERS, default="bfs")
+    record.add_argument("--map", help="run on this map file (python -m simulation.mapfile) instead of the built-in map")
+    info = commands.add_parser("info", help="summarize a recording")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        city = MapFile(args.map) if args.map else None
+        try:
+            world = record_run(args.path, args.ticks, victim_count=args.victims, npc_count=args.npcs,
+                               planner=args.planner, seed=args.seed, city=city)
+        finally:
+            if city is not None:
+                city.close()
+        print(f"Recorded {world.tick} ticks to {args.path} ({world.rescued_count} rescued)")
+    else:
+        replay = TrajectoryReplay(args.path)
+        last = replay.frame(len(replay) - 1)
+        kinds = np.bincount(replay.events["kind"], minlength=len(EVENT_KINDS))
+        source = replay.meta["map"]
+        print(f"{len(replay)} frames, ticks {int(replay.frames['tick'][0])}..{last.tick}, "
+              f"{replay.meta['npc_count']} NPCs, seed {replay.meta['seed']}, "
+              f"{source.get('path', source['source'])} map")
+        print(", ".join(f"{kind}: {count}" for kind, count in zip(EVENT_KINDS, kinds.tolist())))
+        print(f"rescued {last.rescued_count}, victims left {len(last.victims)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,990 @@
+import random
+from collections import namedtuple
+
+import numpy as np
+
+from behaviors.seek import Seek
+from vector import Vector2D
+from simulation.spatial import SpatialHash, KDTree
+from simulation.assignment import VictimAssigner
+from simulation.victims import VictimStore
+from simulation.obstacles import ObstacleMap
+from pathfinding.routes import RouteTable, PathCache
+from pathfinding.astar import AStarPlanner
+from pathfinding.hpa import HierarchicalPlanner
+from pathfinding.graph import WaypointGraph
+from pathfinding.flowfield import FlowField
+from pathfinding.smoothing import VisibilityMatrix, smooth_path
+
+RescueSnapshot = namedtuple(
+    "RescueSnapshot",
+    "tick npc_states npc_positions npc_velocities player_pos player_vel victims rescued_count player_carrying",
+)
+
+# Events passed to RescueWorld listeners as listener(kind, agent, position, victim);
+# agent is the NPC index, -1 for the player, or None for map events, and
+# victim is the victim's id for spawns and pickups (None otherwise)
+EVENT_KINDS = ("reset", "spawn", "pickup", "delivery")
+PLAYER = -1
+
+
+class RescueNPC:
+    """One rescue vehicle: its motion and search/deliver state."""
+
+    def __init__(self, position, index=0):
+        self.index = index
+        self.pos = position
+        self.vel = Vector2D(0, 0)
+        self.target = None
+        self.victim = None  # id of the claimed victim while searching
+        self.carrying_victim = None
+        self.plan_dirty = False  # set by events; the target and path are redone before the next move
+        self.state = "searching"  # searching, delivering
+        self.path = []
+        self.pending = []  # hpa planner: abstract route nodes whose legs are not refined into path yet
+        self.current_waypoint_index = 0
+        self.distance_travelled = 0.0
+
+
+class RescueWorld:
+    """Headless state, AI and movement for the Lab02 rescue simulation.
+
+    Nothing here touches tkinter; RescueSimulation in mainLab02.py is a viewer
+    that reads this state and forwards keyboard input.
+    """
+
+    PLANNERS = ("bfs", "astar", "hpa")
+    # Width of the hpa planner's square clusters, in world units
+    HPA_CLUSTER_SIZE = 1000
+    # How delivering NPCs reach a hospital: their own planned path, or the shared flow field
+    DELIVERY_MODES = ("path", "flow")
+    # String pulling on NPC paths: off, with line-of-sight queries, or with a precomputed waypoint visibility matrix
+    SMOOTHING_MODES = ("none", "los", "visibility")
+
+    # Methods a FrameProfiler times (as phases) or counts when attached
+    PROFILED_PHASES = {"assign_victims": "assign", "update_npc": "npcs", "update_player": "player"}
+    PROFILED_COUNTERS = {
+        "bfs_find_path": "path_queries",
+        "find_node_path": "planner_lookups",
+        "extend_path": "route_legs",
+        "is_valid_position": "collision_checks",
+        "slide": "collision_sweeps",
+    }
+
+    # Shared, never mutated: the target velocity passed to Seek for static targets
+    ZERO_VELOCITY = Vector2D(0, 0)
+
+    # Where the player starts, and where it is parked when the world runs without one
+    # (far enough off every map that no NPC ever comes within its flee radius)
+    PLAYER_START = (700, 500)
+    PLAYER_PARKED = (-1e6, -1e6)
+
+    # Area victims are spawned in on the built-in map: (min x, min y, max x, max y)
+    SPAWN_ZONES = ((50, 50, 750, 550),)
+
+    def __init__(self, victim_count=8, planner="bfs", npc_count=1, seed=None, delivery="path", city=None,
+                 smoothing="none", player=True):
+        if planner not in self.PLANNERS:
+            raise ValueError(f"Unknown planner {planner!r}, expected one of {self.PLANNERS}")
+        if delivery not in self.DELIVERY_MODES:
+            raise ValueError(f"Unknown delivery mode {delivery!r}, expected one of {self.DELIVERY_MODES}")
+        if smoothing not in self.SMOOTHING_MODES:
+            raise ValueError(f"Unknown smoothing mode {smoothing!r}, expected one of {self.SMOOTHING_MODES}")
+        self.victim_count = victim_count
+        self.planner = planner
+        self.delivery = delivery
+        self.smoothing = smoothing
+        # player=False takes the player out of play (headless runs nobody steers): it is parked
+        # off the map, never moves and so never scares NPCs away from a victim
+        self.player_enabled = player
+        self.visibility = None  # waypoint VisibilityMatrix, built on first use with smoothing="visibility"
+        self.tick = 0
+        self.status = "Rescue Simulation Running"
+
+        # All randomness (victim placement, avoidance) comes from this RNG,
+        # so a seeded world replays the same run
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.listeners = []
+
+        # Game elements. `city` replaces the built-in map: a generated City
+        # (simulation.citygen) or a MapFile (simulation.mapfile). It is only read
+        # while setting up, and everything kept is copied out, so it can be closed
+        # once the world is built
+        self.city = city
+        self.spawn_zones = list(self.SPAWN_ZONES if city is None else city.spawn_bounds())
+        self.grid_size = 50
+        self.city_blocks = []
+        self.victims = VictimStore(self.grid_size)
+        self.victim_version = 0  # bumped whenever the victim set changes
+        self.hospitals = []
+        self.waypoints = []  # Vector2D per graph node, for drawing and spawning
+        self.graph = WaypointGraph([], [], [0], [])
+        self.obstacle_maps = {}  # agent radius -> ObstacleMap, cleared by map_changed()
+        self.flow_field = None  # hospital flow field, cleared when blocks or hospitals change
+
+        # Spatial indexes so proximity checks only look at nearby cells
+        self.hospital_index = SpatialHash(self.grid_size)
+        self.waypoint_index = KDTree([])  # node ids, static, rebuilt by build_routes()
+        self.agent_index = SpatialHash(self.grid_size)
+        
+        # Entity states
+        self.npc_count = npc_count
+        self.npcs = []
+        self.assigner = VictimAssigner()
+        self.assignment_dirty = True
+        
+        self.player_pos = Vector2D(*(self.PLAYER_START if self.player_enabled else self.PLAYER_PARKED))
+        self.player_vel = Vector2D(0, 0)
+        self.player_target = None
+        self.player_target_victim = None  # victim id when the player is heading for a pickup
+        self.player_carrying_victim = None
+        
+        # Game parameters
+        self.max_speed = 3
+        self.max_force = 0.5
+        self.seek = Seek()
+        
+        self.rescued_count = 0
+        self.npc_rescues = 0
+        self.player_rescues = 0
+        
+        # Initialize game setup
+        self.setup_game()
+
+    def sync_agent_index(self):
+        "Keep the agent index in step with the NPC and player positions."
+        for npc in self.npcs:
+            self.agent_index.move(npc, npc.pos)
+        self.agent_index.move("player", self.player_pos)
+
+    def spawn_npcs(self):
+        "Place the rescue fleet, taking turns between the hospitals (the first NPC starts top-left)."
+        for npc in self.npcs:
+            self.agent_index.remove(npc)
+        self.npcs = []
+        for i in range(self.npc_count):
+            hospital = self.hospitals[i % len(self.hospitals)]
+            self.npcs.append(RescueNPC(Vector2D(hospital.x, hospital.y), i))
+        self.assigner.clear()
+
+    def emit(self, kind, agent, position, victim=None):
+        "Tell every listener about a reset, spawn, pickup or delivery."
+        for listener in self.listeners:
+            listener(kind, agent, position, victim)
+
+    def add_victim(self, position):
+        "Add a victim at position and return its id."
+        victim = self.victims.add(position)
+        self.victim_version += 1
+        self.assignment_dirty = True
+        if self.listeners:
+            self.emit("spawn", None, position, victim)
+        return victim
+
+    def remove_victim(self, victim):
+        "Remove a victim by id and return its position."
+        position = self.victims.remove(victim)
+        self.victim_version += 1
+        # Whoever had claimed this victim needs a new one; nobody else is touched
+        npc = self.assigner.release(victim)
+        if npc is not None and npc.victim == victim and npc.state == "searching":
+            npc.victim = None
+            npc.target = None
+            self.assignment_dirty = True
+        return position
+
+    def pickup(self, agent, victim):
+        "Agent (an NPC index or PLAYER) picks up a victim by id."
+        if agent == PLAYER:
+            npc = None
+        else:
+            npc = self.npcs[agent]
+            npc.state = "delivering"
+            npc.victim = None
+        position = self.remove_victim(victim)
+        if npc is None:
+            self.player_carrying_victim = position
+        else:
+            npc.carrying_victim = position
+            self.invalidate(npc)
+        if self.listeners:
+            self.emit("pickup", agent, position, victim)
+        if npc is None:
+            self.status = f"Player picked up victim. Remaining: {len(self.victims)}"
+
+    def deliver(self, agent):
+        "Agent (an NPC index or PLAYER) drops its victim off at a hospital."
+        npc = None if agent == PLAYER else self.npcs[agent]
+        if self.listeners:
+            self.emit("delivery", agent, self.player_carrying_victim if npc is None else npc.carrying_victim)
+        self.rescued_count += 1
+        if npc is None:
+            self.player_carrying_victim = None
+            self.player_rescues += 1
+        else:
+            npc.carrying_victim = None
+            self.npc_rescues += 1
+            # Back to searching; the next victim is claimed before the NPC moves again
+            npc.state = "searching"
+            npc.target = None
+            self.invalidate(npc)
+        self.status = f"Victims rescued: {self.rescued_count} | Remaining: {len(self.victims)}"
+
+    def invalidate(self, npc):
+        "Mark an NPC's plan stale; it is redone on the NPC's next update instead of being polled."
+        npc.plan_dirty = True
+
+    def replan(self, npc):
+        "Redo a stale plan: a hospital route when delivering, a fresh claim when searching."
+        npc.plan_dirty = False
+        if npc.state == "delivering":
+            self.set_npc_target(npc, self.hospital_for(npc))
+        elif npc.target is None:
+            self.assign_victims([npc])
+
+    def setup_game(self):
+        "Initializing the game world with all elements"
+        self.setup_city()
+        self.setup_waypoints()
+        self.create_hospitals()
+        self.spawn_npcs()
+        self.sync_agent_index()
+        self.spawn_victims(self.victim_count)
+
+    def reset_simulation(self, victim_count=None, seed=None):
+        "Reset the simulation state"
+        if victim_count is not None:
+            self.victim_count = victim_count
+        if seed is not None:
+            self.seed = seed
+            self.rng.seed(seed)
+        # I Cleared here the existing game objects
+        self.tick = 0
+        self.victims.clear()
+        self.spawn_npcs()
+        
+        self.player_pos = Vector2D(*(self.PLAYER_START if self.player_enabled else self.PLAYER_PARKED))
+        self.player_vel = Vector2D(0, 0)
+        self.player_target = None
+        self.player_target_victim = None
+        self.player_carrying_victim = None
+        
+        self.rescued_count = 0
+        self.npc_rescues = 0
+        self.player_rescues = 0
+        self.sync_agent_index()
+        
+        # Here Spawn new victims
+        self.spawn_victims(self.victim_count)
+        
+        # Update status
+        self.status = f"Simulation Reset. Victims: {len(self.victims)}"
+
+    def setup_city(self):
+        "I Created here obstacles as city blocks."
+        if self.city is not None:
+            self.city_blocks = self.city.block_dicts()
+            self.map_changed()
+            return
+        for x in range(2, 14, 3):
+            for y in range(2, 10, 3):
+                block = {
+                    'x': x * self.grid_size,
+                    'y': y * self.grid_size,
+                    'width': self.grid_size * 2,
+                    'height': self.grid_size * 2
+                }
+                self.city_blocks.append(block)
+        self.map_changed()
+
+    def map_changed(self, region=None):
+        """Call after editing city_blocks; obstacle maps and flow fields are rebuilt on next use.
+
+        Pass region=(min x, min y, max x, max y) around the edited blocks to
+        re-check the streets there as well: a street that now runs through a
+        block is closed and one that no longer does is reopened. The BFS and
+        A* tables are rebuilt, the hpa planner only rebuilds the clusters
+        of the changed streets, and NPCs with a target replan.
+        """
+        self.obstacle_maps = {}
+        self.flow_field = None
+        self.visibility = None
+        if region is None:
+            return
+        changed = self.update_streets(region)
+        if not changed:
+            return
+        self.route_table = RouteTable(self.graph)
+        self.astar = AStarPlanner(self.graph)
+        self.hpa.invalidate(changed)
+        self.path_cache.clear()
+        for npc in self.npcs:
+            if npc.target is not None:
+                self.set_npc_target(npc, npc.target)
+
+    def update_streets(self, region):
+        "Open or close the streets near region by whether they cross a block; returns the nodes of changed ones."
+        graph = self.graph
+        obstacles = self.obstacles()
+        pad = obstacles.radius
+        x0, y0, x1, y1 = region
+        sources = np.repeat(np.arange(len(graph)), np.diff(graph.indptr))
+        targets = graph.indices
+        ax, ay, bx, by = graph.xs[sources], graph.ys[sources], graph.xs[targets], graph.ys[targets]
+        near = ((np.minimum(ax, bx) <= x1 + pad) & (np.maximum(ax, bx) >= x0 - pad)
+                & (np.minimum(ay, by) <= y1 + pad) & (np.maximum(ay, by) >= y0 - pad))
+        points = graph.points
+        changed = set()
+        for a, b in zip(sources[near].tolist(), targets[near].tolist()):
+            # Checked both ways: a sweep ignores a block it starts inside
+            is_open = obstacles.segment_clear(points[a], points[b]) and obstacles.segment_clear(points[b], points[a])
+            if graph.set_street_open(a, b, is_open):
+                changed.update((a, b))
+        return changed
+
+    def obstacles(self, radius=15):
+        "The occupancy bitmap and distance field of the blocks inflated by `radius`."
+        obstacle_map = self.obstacle_maps.get(radius)
+        if obstacle_map is None:
+            obstacle_map = self.obstacle_maps[radius] = ObstacleMap(self.city_blocks, radius)
+        return obstacle_map
+
+    def slide(self, position, delta):
+        "Move position by delta against the blocks, sliding along faces (see ObstacleMap.slide)."
+        return self.obstacles().slide(position, delta)
+
+    def hospital_flow(self):
+        "Flow field towards the nearest hospital, shared by every delivering NPC."
+        if self.flow_field is None:
+            self.flow_field = FlowField(self.obstacles(), self.hospitals)
+        return self.flow_field
+
+    def setup_waypoints(self):
+        "Setting up the waypoints and their connections"
+        if self.city is not None:
+            self.set_graph(self.city.waypoint_graph())
+            return
+        # Create key waypoints - representing street intersections
+        waypoints = [
+            Vector2D(50, 50),    #0
+            Vector2D(750, 50),   
+            Vector2D(750, 550),  #2
+            Vector2D(50, 550),   #3
+            Vector2D(50, 225),  #4 
+            Vector2D(750, 225),  
+            Vector2D(50, 375),   #6
+            Vector2D(750, 375),  
+            Vector2D(225, 50),   #8  
+            Vector2D(225, 550),  #9
+            Vector2D(375, 50),  #10 
+            Vector2D(375, 550),  #11
+            Vector2D(525, 50),   
+            Vector2D(525, 550),  
+            Vector2D(225, 225),  #14
+            Vector2D(375, 225),  
+            Vector2D(525, 225),  
+            Vector2D(225, 375),  
+            Vector2D(375, 375),  
+            Vector2D(525, 375)   
+        ]
+        
+        # I Defined here the connections between waypoints (representing streets)
+        # Each waypoint is a node (intersection) and the connections define navigable paths.
+        adjacency = {
+            # Top row connections
+            waypoints[0]: [waypoints[8], waypoints[4], waypoints[3]],
+            waypoints[8]: [waypoints[0], waypoints[10], waypoints[14]],
+            waypoints[10]: [waypoints[8], waypoints[12], waypoints[15]],
+            waypoints[12]: [waypoints[10], waypoints[1], waypoints[16]],
+            waypoints[1]: [waypoints[12], waypoints[5], waypoints[2]],
+            
+            # Middle row connections
+            waypoints[4]: [waypoints[0], waypoints[14], waypoints[6]],
+            waypoints[14]: [waypoints[8], waypoints[4], waypoints[15], waypoints[17]],
+            waypoints[15]: [waypoints[10], waypoints[14], waypoints[16], waypoints[18]],
+            waypoints[16]: [waypoints[12], waypoints[15], waypoints[5], waypoints[19]],
+            waypoints[5]: [waypoints[1], waypoints[16], waypoints[7]],
+            
+            # Lower middle row connections
+            waypoints[6]: [waypoints[4], waypoints[17], waypoints[3]],
+            waypoints[17]: [waypoints[14], waypoints[6], waypoints[18], waypoints[9]],
+            waypoints[18]: [waypoints[15], waypoints[17], waypoints[19], waypoints[11]],
+            waypoints[19]: [waypoints[16], waypoints[18], waypoints[7], waypoints[13]],
+            waypoints[7]: [waypoints[5], waypoints[19], waypoints[2]],
+            
+            # Bottom row connections
+            waypoints[3]: [waypoints[0], waypoints[6], waypoints[9]],
+            waypoints[9]: [waypoints[3], waypoints[17], waypoints[11]],
+            waypoints[11]: [waypoints[9], waypoints[18], waypoints[13]],
+            waypoints[13]: [waypoints[11], waypoints[19], waypoints[2]],
+            waypoints[2]: [waypoints[1], waypoints[7], waypoints[13]]
+        }
+        self.set_graph(WaypointGraph.from_adjacency(waypoints, adjacency))
+
+    def set_graph(self, graph):
+        "Use a new street graph (a WaypointGraph) and rebuild everything derived from it."
+        self.graph = graph
+        self.waypoints = graph.points
+        self.build_routes()
+
+    def build_routes(self):
+        "Index the (static) waypoint graph, set up its planners and start a fresh path cache."
+        graph = self.graph
+        self.waypoint_index = KDTree(range(len(graph)), np.column_stack([graph.xs, graph.ys]))
+        self.route_table = RouteTable(graph)
+        self.astar = AStarPlanner(graph)
+        self.hpa = HierarchicalPlanner(graph, self.HPA_CLUSTER_SIZE)
+        self.path_cache = PathCache(maxsize=512)
+        self.visibility = None
+        if self.smoothing == "visibility" and len(graph) > VisibilityMatrix.MAX_NODES:
+            raise ValueError(f"smoothing='visibility' supports up to {VisibilityMatrix.MAX_NODES} waypoints, "
+                             f"this map has {len(graph)}; use smoothing='los'")
+
+    def set_planner(self, planner):
+        "Switch between hop-count BFS ('bfs'), distance-weighted A* ('astar') and hierarchical A* ('hpa')."
+        if planner not in self.PLANNERS:
+            raise ValueError(f"Unknown planner {planner!r}, expected one of {self.PLANNERS}")
+        if planner != self.planner:
+            self.planner = planner
+            self.path_cache.clear()
+
+    def spawn_victims(self, count):
+        "Place victims on the map avoiding obstacles."
+        self.victims.clear()
+        self.victim_version += 1
+        self.assigner.clear()
+        if self.listeners:
+            self.emit("reset", None, None)
+        rng = self.rng
+        attempted = 0
+        # Large victim counts need more tries; small ones keep the original 100
+        while len(self.victims) < count and attempted < max(100, count * 20):
+            attempted += 1
+            # placing at waypoints first (more realistic - victims on streets);
+            # after 100 tries the spots near intersections are full, so spread out
+            if len(self.victims) < count * 0.7 and self.waypoints and attempted <= 100:
+                waypoint = rng.choice(self.waypoints)
+                # Add slight variation to position
+                x = waypoint.x + rng.randint(-15, 15)
+                y = waypoint.y + rng.randint(-15, 15)
+            else:
+                # Placing here randomly ensuring not too close to edges make it more random and realistic
+                zones = self.spawn_zones
+                min_x, min_y, max_x, max_y = zones[0] if len(zones) == 1 else rng.choice(zones)
+                x = rng.randint(int(min_x), int(max_x))
+                y = rng.randint(int(min_y), int(max_y))
+            
+            # Checking if valid position
+            if self.is_valid_position(x, y):
+                # Checking if not too close to existing victims or hospitals
+                position = Vector2D(x, y)
+                too_close = (self.victims.any_within(position, 30) or
+                             self.hospital_index.any_within(position, 50))
+                        
+                if not too_close:
+                    self.add_victim(position)
+                    
+        self.status = f"Victims spawned: {len(self.victims)}"
+
+    def create_hospitals(self):
+        "Placing hospitals at fixed positions."
+        if self.city is not None:
+            self.hospitals = self.city.hospital_positions()
+        else:
+            self.hospitals = []
+            self.hospitals.append(Vector2D(50, 50))  # Top-left hospital
+            self.hospitals.append(Vector2D(750, 550))  # Bottom-right hospital
+        self.hospital_index.clear()
+        for hospital in self.hospitals:
+            self.hospital_index.insert(hospital, hospital)
+        self.flow_field = None
+        # Delivering NPCs may be heading for a hospital that is gone
+        for npc in self.npcs:
+            if npc.state == "delivering":
+                self.invalidate(npc)
+
+    def find_closest(self, position, index):
+        "Find the closest entity in a spatial index. Used when searching of victims and when delivering to the nearest hospital"
+        return index.nearest(position)
+
+    def set_player_target(self, target, victim=None):
+        "Send the player to target; pass the victim id when the target is a victim to pick up."
+        self.player_target = target
+        self.player_target_victim = victim
+
+    # Player this interaction method
+    def check_player_interactions(self):
+        "hERE Checking for player interactions with victims and hospitals"
+        # Check for victim pickup
+        if not self.player_carrying_victim:
+            victim = self.victims.nearest(self.player_pos, max_distance=15)
+            if victim is not None:
+                self.pickup(PLAYER, victim)
+        
+        # Check for hospital dropoff
+        elif self.player_carrying_victim:
+            if self.hospital_index.any_within(self.player_pos, 20):
+                self.deliver(PLAYER)
+    
+    def is_valid_position(self, x, y, radius=15, check_npc=True):
+        "I Checked here if the position collides with a city block or NPC."
+        # Check collision with city blocks (one bitmap lookup instead of a loop over blocks)
+        if not self.obstacles(radius).is_free(x, y):
+            return False
+        
+        # Check collision with NPC if requested
+        if check_npc:
+            npc_collision_distance = 30  # Combined radius of player and NPC
+            for agent in self.agent_index.query_radius(Vector2D(x, y), npc_collision_distance):
+                if agent != "player":
+                    return False
+        
+        return True
+
+    def closest_node(self, position, reachable=False):
+        """Id of the graph node closest to the given position, or None without a graph.
+
+        With reachable=True only nodes with a straight, block-free line from
+        position count; if none has one, the plain closest is returned.
+        """
+        if reachable:
+            obstacles = self.obstacles()
+            points = self.graph.points
+            node = self.waypoint_index.nearest(
+                position, accept=lambda node: obstacles.segment_clear(position, points[node])
+            )
+            if node is not None:
+                return node
+        return self.waypoint_index.nearest(position)
+
+    def get_closest_waypoint(self, position, reachable=False):
+        """Find the closest waypoint to the given position (see closest_node)."""
+        node = self.closest_node(position, reachable)
+        return None if node is None else self.graph.points[node]
+
+    def get_closest_waypoints(self, position, k):
+        "The k waypoints closest to position, nearest first."
+        return self.graph.path_points(self.waypoint_index.k_nearest(position, k))
+
+    def bfs_find_path(self, start_pos, end_pos):
+        """Find path from start to end using BFS on waypoint graph."""
+        # First get closest waypoints to start and end positions
+        start_node = self.closest_node(start_pos)
+        end_node = self.closest_node(end_pos)
+        
+        if start_node is None or end_node is None:
+            return [start_pos, end_pos]  # Direct line if no waypoints
+            
+        # If start and end are close enough, go direct
+        if start_pos.distance_squared_to(end_pos) < 100 * 100:
+            return [start_pos, end_pos]
+        
+        # Plan on node ids (cached per pair); only the result becomes waypoints
+        nodes = self.find_node_path(start_node, end_node)
+        if nodes:
+            # Complete path found, add start and end points
+            complete_path = [start_pos]
+            complete_path.extend(self.graph.path_points(nodes))
+            complete_path.append(end_pos)
+            return complete_path
+                    
+        # No path found between waypoints, try direct path
+        return [start_pos, end_pos]
+
+    def find_node_path(self, start_node, end_node):
+        "Node ids from start to end inclusive, or an empty tuple if unreachable."
+        key = (start_node, end_node)
+        path = self.path_cache.get(key)
+        if path is None:
+            if self.planner == "astar":
+                path = self.astar.path_ids(start_node, end_node)
+            elif self.planner == "hpa":
+                path = self.hpa.path_ids(start_node, end_node)
+            else:
+                path = self.route_table.path_ids(start_node, end_node)
+            path = tuple(path or ())
+            self.path_cache.put(key, path)
+        return path
+
+    def set_npc_target(self, npc, target):
+        "Point an NPC at a new target and plan its route there."
+        npc.target = target
+        if target and self.follows_flow(npc):
+            # The flow field replaces the planned path
+            npc.path = []
+            npc.pending = []
+            npc.current_waypoint_index = 0
+        elif target:
+            self.plan_npc_path(npc, target)
+
+    def plan_npc_path(self, npc, target):
+        """Give an NPC a fresh path to target.
+
+        The hpa planner only refines the first leg of its route now; the
+        rest waits in npc.pending and move_along_path() refines each leg
+        as the NPC reaches the end of the one before.
+        """
+        npc.current_waypoint_index = 0
+        npc.pending = []
+        if self.planner != "hpa":
+            npc.path = self.smooth_path(self.bfs_find_path(npc.pos, target))
+            return
+        start_node = self.closest_node(npc.pos)
+        end_node = self.closest_node(target)
+        route = None
+        if start_node is not None and end_node is not None and npc.pos.distance_squared_to(target) >= 100 * 100:
+            route = self.hpa.abstract_path(start_node, end_node)
+        if not route:
+            npc.path = [npc.pos, target]  # same fallbacks as bfs_find_path
+            return
+        npc.path = [npc.pos, self.graph.points[route[0]]]
+        npc.pending = route
+        self.extend_path(npc)
+
+    def extend_path(self, npc):
+        "Refine the next leg of an NPC's hpa route onto its path (its target after the last leg)."
+        route = npc.pending
+        if len(route) == 1:
+            npc.pending = []
+            added = [npc.target]
+        else:
+            leg = self.hpa.refine(route[0], route[1])
+            if leg is None:
+                # A street on the route closed since it was planned
+                self.plan_npc_path(npc, npc.target)
+                return
+            npc.pending = route[1:]
+            added = self.graph.path_points(leg[1:])
+        # Smooth what is still ahead together with the new leg
+        index = npc.current_waypoint_index
+        npc.path = npc.path[:index] + self.smooth_path(npc.path[index:] + added)
+
+    def line_of_sight(self):
+        "The visible(a, b) test smoothing uses: the waypoint visibility matrix, or the obstacle map directly."
+        if self.smoothing == "visibility":
+            if self.visibility is None:
+                self.visibility = VisibilityMatrix(self.waypoints, self.obstacles())
+            return self.visibility.visible
+        return self.obstacles().segment_clear
+
+    def smooth_path(self, path):
+        "Drop the waypoints of path an NPC can skip in a straight line (unchanged with smoothing='none')."
+        if self.smoothing == "none":
+            return path
+        return smooth_path(path, self.line_of_sight())
+
+    def assign_victims(self, npcs=None):
+        """Batch-assign free victims to idle searching NPCs.
+
+        Solves one assignment over the whole group instead of letting each NPC
+        grab its closest victim, then plans a route for every new claim. With
+        no argument it only runs when something changed since the last solve
+        (victims spawned, a claim was released, an NPC became idle).
+        """
+        if npcs is None:
+            if not self.assignment_dirty:
+                return
+            self.assignment_dirty = False
+            npcs = self.npcs
+        idle = [npc for npc in npcs if npc.state == "searching" and npc.target is None]
+        if not idle:
+            return
+        for npc, victim in self.assigner.assign(idle, self.victims).items():
+            npc.victim = victim
+            self.set_npc_target(npc, self.victims[victim])
+
+    def follows_flow(self, npc):
+        return self.delivery == "flow" and npc.state == "delivering"
+
+    def hospital_for(self, npc):
+        "The hospital a delivering NPC heads for: the closest one, or the one its flow leads to."
+        if self.delivery == "flow":
+            hospital = self.hospital_flow().goal_at(npc.pos.x, npc.pos.y)
+            if hospital is not None:
+                return hospital
+        return self.find_closest(npc.pos, self.hospital_index)
+
+    def update_npc(self, npc):
+        "I am trying here to update NPC behavior based on state and targets."
+        # State machine for NPC behavior
+        if npc.state == "searching":
+            # Nothing left to search for
+            if not self.victims:
+                self.status = "All victims rescued!"
+                return
+                
+            # Victims are handed out in batches by assign_victims() at the
+            # start of the tick, so there is no per-NPC victim scan here
+            
+            # Check if NPC reached its victim (a lost claim clears the target, so no membership scan)
+            if npc.target and npc.pos.distance_squared_to(npc.target) < 15 * 15:
+                self.pickup(npc.index, npc.victim)
+
+        elif npc.state == "delivering":
+            # Check if NPC reached a hospital
+            if npc.target and npc.pos.distance_squared_to(npc.target) < 15 * 15:
+                self.deliver(npc.index)
+
+        # Pickups, deliveries and hospital changes mark the plan dirty
+        if npc.plan_dirty:
+            self.replan(npc)
+        
+        # Move NPC along path regardless of state
+        self.move_along_path(npc)
+    
+    def move_along_path(self, npc):
+        "Move NPC along the calculated path."
+        if npc.pos.distance_squared_to(self.player_pos) < 60 * 60:
+            # Try to avoid player
+            if self.avoid_obstacle(npc):
+                # Successfully avoided player, may need to recalculate path
+                if npc.target:
+                    # Only recalculate if we've moved significantly off path
+                    if npc.current_waypoint_index < len(npc.path):
+                        current_target = npc.path[npc.current_waypoint_index]
+                        if npc.pos.distance_squared_to(current_target) > 40 * 40:
+                            # Recalculate path from current position
+                            self.plan_npc_path(npc, npc.target)
+                            self.skip_passed_waypoint(npc)
+                return
+        
+        if self.follows_flow(npc):
+            current_target = self.flow_target(npc)
+            if current_target is None:
+                return
+        else:
+            # Continue with regular path following if no player avoidance needed
+            if not npc.path or npc.current_waypoint_index >= len(npc.path):
+                return
+                
+            current_target = npc.path[npc.current_waypoint_index]
+            
+            # If close to current waypoint, move to next one
+            if npc.pos.distance_squared_to(current_target) < 10 * 10:
+                npc.current_waypoint_index += 1
+                if npc.pending and npc.current_waypoint_index >= len(npc.path) - 1:
+                    # Refine the next leg of an hpa route before the NPC runs out of path
+                    self.extend_path(npc)
+                if npc.current_waypoint_index >= len(npc.path):
+                    # End of path reached
+                    npc.vel = Vector2D(0, 0)
+                    return
+                current_target = npc.path[npc.current_waypoint_index]
+        
+        # Calculate steering force towards current waypoint
+        steering = self.seek.calculate(
+            npc.pos, npc.vel,
+            current_target, self.ZERO_VELOCITY,
+            self.max_speed, self.max_force
+        )
+        
+        # Apply steering force and limit speed
+        npc.vel += steering
+        npc.vel.clamp_length_ip(self.max_speed)
+            
+        # Move NPC, sliding along any block face the step runs into
+        new_pos, normal = self.slide(npc.pos, npc.vel)
+        if normal is not None:
+            # Drop the part of the velocity that pushes into the block
+            into = npc.vel.x * normal[0] + npc.vel.y * normal[1]
+            if into < 0:
+                npc.vel -= Vector2D(normal[0] * into, normal[1] * into)
+            if new_pos == npc.pos:
+                # Hit a face head-on: turn along it towards the target
+                npc.vel = self.obstacles().escape_direction(npc.pos, current_target - npc.pos) * self.max_speed
+        npc.pos = new_pos
+
+    def skip_passed_waypoint(self, npc):
+        """After replanning from off the route, skip a first waypoint that lies behind the NPC.
+
+        The nearest waypoint is often the one just passed; heading back to
+        it first is what made NPCs shuttle back and forth near the player.
+        """
+        path = npc.path
+        index = npc.current_waypoint_index + 1
+        if index + 1 < len(path):
+            if npc.pos.distance_squared_to(path[index + 1]) <= path[index].distance_squared_to(path[index + 1]):
+                npc.current_waypoint_index = index + 1
+
+    def flow_target(self, npc):
+        "Point a little way down the hospital flow field (the hospital itself once close)."
+        if npc.target is None:
+            return None
+        if npc.pos.distance_squared_to(npc.target) < 40 * 40:
+            return npc.target
+        heading = self.hospital_flow().heading(npc.pos.x, npc.pos.y)
+        if heading.length_squared() == 0:
+            return npc.target
+        heading *= 20
+        heading += npc.pos
+        return heading
+
+    def avoid_obstacle(self, npc):
+        """Simple obstacle avoidance behavior."""
+        player_distance = npc.pos.distance_to(self.player_pos)
+        if player_distance < 60:  # Detect player from further away
+            # Calculate vector away from player
+            away_vector = npc.pos - self.player_pos
+            if away_vector.length_squared() > 0:
+                away_vector.normalize_ip()
+                away_vector *= self.max_speed
+                
+                # Stronger avoidance force when closer to player
+                avoidance_force = self.max_force * (1 + (60 - player_distance) / 30)
+                
+                # Apply steering away from player and limit speed
+                away_vector *= avoidance_force
+                npc.vel += away_vector
+                npc.vel.clamp_length_ip(self.max_speed)
+                
+                # Try moving with new velocity
+                new_pos = npc.pos + npc.vel
+                
+                # Check if new position is valid (ignoring NPC-player collision check to avoid recursion)
+                if self.is_valid_position(new_pos.x, new_pos.y, check_npc=False):
+                    npc.pos = new_pos
+                    return True
+        # If player avoidance didn't succeed or wasn't needed, use original method
+        # Get the closest waypoint
+        closest_waypoint = self.get_closest_waypoint(npc.pos, reachable=True)
+        
+        if closest_waypoint:
+            # Try steering towards the closest waypoint
+            steering = self.seek.calculate(
+                npc.pos, npc.vel,
+                closest_waypoint, self.ZERO_VELOCITY,
+                self.max_speed, self.max_force * 2  # Stronger force to avoid obstacle
+            )
+            
+            # Apply steering and limit speed
+            npc.vel += steering
+            npc.vel.clamp_length_ip(self.max_speed)
+                
+            # Move NPC
+            new_pos = npc.pos + npc.vel
+            
+            # Check if new position is valid
+            if self.is_valid_position(new_pos.x, new_pos.y, check_npc=False):
+                npc.pos = new_pos
+                return True
+            else:
+                # Still blocked: slide along the block (distance field gradient) instead of a random heading
+                npc.vel = self.obstacles().escape_direction(npc.pos, closest_waypoint - npc.pos) * self.max_speed
+                return False
+        return False
+                
+    def update_player(self):
+        "Here i am updating player position and actions."
+        if not self.player_enabled:
+            return
+        if self.player_target:
+            # Calculate steering force
+            steering = self.seek.calculate(
+                self.player_pos, self.player_vel,
+                self.player_target, self.ZERO_VELOCITY,
+                self.max_speed, self.max_force
+            )
+            
+            # Apply steering and limit speed
+            self.player_vel += steering
+            self.player_vel.clamp_length_ip(self.max_speed)
+                
+            # Move player
+            new_pos = self.player_pos + self.player_vel
+            
+            # Check if new position is valid
+            if self.is_valid_position(new_pos.x, new_pos.y):
+                self.player_pos = new_pos
+            # Check if reached target
+            if self.player_pos.distance_squared_to(self.player_target) < 10 * 10:
+                # Check if target is a victim (for pickup)
+                if not self.player_carrying_victim and self.player_target_victim in self.victims:
+                    self.pickup(PLAYER, self.player_target_victim)
+                
+                # Check if target is a hospital (for dropoff)
+                elif self.player_carrying_victim:
+                    if self.hospital_index.any_within(self.player_pos, 20):
+                        self.deliver(PLAYER)
+                
+                # Reset target
+                self.player_target = None
+                self.player_target_victim = None
+                self.player_vel = Vector2D(0, 0)
+        elif self.player_vel.length_squared() > 0:
+            # Move player directly with current velocity
+            new_pos = self.player_pos + self.player_vel
+            
+            # Check if new position is valid
+            if self.is_valid_position(new_pos.x, new_pos.y):
+                self.player_pos = new_pos
+                
+            # Check for interactions
+            self.check_player_interactions()
+
+    def step(self):
+        """Advance the simulation by one tick."""
+        self.tick += 1
+        self.assign_victims()
+        for npc in self.npcs:
+            previous = npc.pos
+            self.update_npc(npc)
+            if npc.pos is not previous:
+                npc.distance_travelled += previous.distance_to(npc.pos)
+            self.agent_index.move(npc, npc.pos)
+        self.update_player()
+        self.agent_index.move("player", self.player_pos)
+
+    def is_finished(self):
+        "True once every victim has been picked up and delivered."
+        if self.victims or self.player_carrying_victim:
+            return False
+        return not any(npc.carrying_victim for npc in self.npcs)
+
+    def snapshot(self):
+        return RescueSnapshot(
+            self.tick,
+            tuple(npc.state for npc in self.npcs),
+            tuple((npc.pos.x, npc.pos.y) for npc in self.npcs),
+            tuple((npc.vel.x, npc.vel.y) for npc in self.npcs),
+            (self.player_pos.x, self.player_pos.y),
+            (self.player_vel.x, self.player_vel.y),
+            tuple((v.x, v.y) for v in self.victims.values()),
+            self.rescued_count,
+            self.player_carrying_victim is not None,
+        )
+
+    def restore(self, snapshot):
+        """Show a recorded snapshot: copy its positions, states and victims into this world.
+
+        Meant for viewers replaying a recording. Paths, targets and claims are
+        not part of a snapshot, so stepping a restored world does not
+        continue the original run exactly.
+        """
+        self.tick = snapshot.tick
+        while len(self.npcs) < len(snapshot.npc_positions):
+            self.npcs.append(RescueNPC(Vector2D(0, 0), len(self.npcs)))
+        del self.npcs[len(snapshot.npc_positions):]
+        for npc, state, (x, y), (vx, vy) in zip(
+            self.npcs, snapshot.npc_states, snapshot.npc_positions, snapshot.npc_velocities
+        ):
+            npc.state = state
+            npc.pos = Vector2D(x, y)
+            npc.vel = Vector2D(vx, vy)
+            npc.carrying_victim = True if state == "delivering" else None
+            npc.target = None
+            npc.victim = None
+            npc.path = []
+            npc.pending = []
+            if state == "delivering":
+                self.invalidate(npc)
+        self.player_pos = Vector2D(*snapshot.player_pos)
+        self.player_vel = Vector2D(*snapshot.player_vel)
+        self.player_carrying_victim = True if snapshot.player_carrying else None
+        if tuple((v.x, v.y) for v in self.victims.values()) != tuple(snapshot.victims):
+            self.victims.clear()
+            for x, y in snapshot.victims:
+                self.victims.add(Vector2D(x, y))
+            self.victim_version += 1
+        self.rescued_count = snapshot.rescued_count
+        self.sync_agent_index()
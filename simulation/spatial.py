@@ -0,0 +1,258 @@
+import heapq
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    """Uniform grid that buckets items by position.
+
+    Items must be hashable. Each one is stored with an (x, y) copy of the
+    position it was inserted at, so later in-place changes to the caller's
+    vector never leave it in the wrong bucket; call move() instead. Radius and
+    nearest-neighbour queries only look at nearby cells and compare squared
+    distances.
+    """
+
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+        self.min_cell = None
+        self.max_cell = None
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def clear(self):
+        self.cells = {}
+        self.positions = {}
+        self.min_cell = None
+        self.max_cell = None
+
+    def insert(self, item, position):
+        if item in self.positions:
+            self.remove(item)
+        point = (position.x, position.y)
+        cell = self.cell_of(point[0], point[1])
+        self.cells.setdefault(cell, {})[item] = point
+        self.positions[item] = point
+        # Bounds only ever grow; they just cap how far nearest() searches
+        if self.min_cell is None:
+            self.min_cell = cell
+            self.max_cell = cell
+        else:
+            self.min_cell = (min(self.min_cell[0], cell[0]), min(self.min_cell[1], cell[1]))
+            self.max_cell = (max(self.max_cell[0], cell[0]), max(self.max_cell[1], cell[1]))
+
+    def remove(self, item):
+        point = self.positions.pop(item, None)
+        if point is None:
+            return False
+        cell = self.cell_of(point[0], point[1])
+        bucket = self.cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self.cells[cell]
+        return True
+
+    def move(self, item, position):
+        "Update an item's position, only touching the buckets when it changes cell."
+        old = self.positions.get(item)
+        cell = self.cell_of(position.x, position.y)
+        if old is not None and self.cell_of(old[0], old[1]) == cell:
+            point = (position.x, position.y)
+            self.cells[cell][item] = point
+            self.positions[item] = point
+        else:
+            self.insert(item, position)
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield (cx, cy)
+            return
+        for x in range(cx - r, cx + r + 1):
+            yield (x, cy - r)
+            yield (x, cy + r)
+        for y in range(cy - r + 1, cy + r):
+            yield (cx - r, y)
+            yield (cx + r, y)
+
+    def position_of(self, item):
+        "The (x, y) an item was last inserted or moved to."
+        return self.positions[item]
+
+    def query_radius(self, position, radius):
+        "All items strictly closer than radius to position."
+        found = []
+        px, py = position.x, position.y
+        radius_sq = radius * radius
+        min_cx, min_cy = self.cell_of(position.x - radius, position.y - radius)
+        max_cx, max_cy = self.cell_of(position.x + radius, position.y + radius)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for item, (x, y) in bucket.items():
+                    dx = x - px
+                    dy = y - py
+                    if dx * dx + dy * dy < radius_sq:
+                        found.append(item)
+        return found
+
+    def any_within(self, position, radius):
+        return bool(self.query_radius(position, radius))
+
+    def nearest(self, position, max_distance=None, accept=None):
+        """Closest item to position, or None.
+
+        Searches rings of cells outward and stops as soon as no unvisited cell
+        can hold anything closer. `accept` optionally filters items.
+        """
+        if not self.positions:
+            return None
+        cx, cy = self.cell_of(position.x, position.y)
+        max_ring = max(
+            abs(cx - self.min_cell[0]), abs(self.max_cell[0] - cx),
+            abs(cy - self.min_cell[1]), abs(self.max_cell[1] - cy),
+        )
+        if max_distance is not None:
+            max_ring = min(max_ring, int(max_distance // self.cell_size) + 1)
+
+        px, py = position.x, position.y
+        best = None
+        best_distance_sq = math.inf
+        for r in range(max_ring + 1):
+            # Anything in ring r is at least (r - 1) cells away from position
+            reach = (r - 1) * self.cell_size
+            if best is not None and r > 0 and best_distance_sq <= reach * reach:
+                break
+            for cell in self._ring(cx, cy, r):
+                bucket = self.cells.get(cell)
+                if not bucket:
+                    continue
+                for item, (x, y) in bucket.items():
+                    if accept is not None and not accept(item):
+                        continue
+                    dx = x - px
+                    dy = y - py
+                    distance_sq = dx * dx + dy * dy
+                    if distance_sq < best_distance_sq:
+                        best = item
+                        best_distance_sq = distance_sq
+        if max_distance is not None and best_distance_sq >= max_distance * max_distance:
+            return None
+        return best
+
+
+class KDTree:
+    """Static 2-d tree over a fixed set of items, for nearest-neighbour queries.
+
+    Built once with NumPy (median splits on the wider axis, small leaves);
+    queries walk the tree in plain Python and prune with squared distances
+    to the splitting lines. Ties go to the item listed first, like min()
+    over the original list. nearest() has the same signature as
+    SpatialHash.nearest(), and with `accept` it becomes a nearest-reachable
+    query: pruning stays valid, rejected items are just skipped.
+    """
+
+    def __init__(self, items, positions=None, leaf_size=8):
+        self.items = list(items)
+        if positions is None:
+            positions = [(item.x, item.y) for item in self.items]
+        coords = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.xs = coords[:, 0].tolist()
+        self.ys = coords[:, 1].tolist()
+        self.leaf_size = leaf_size
+        self.nodes = []  # (axis, split, left, right, start, end); axis -1 marks a leaf
+        order = np.arange(len(self.items))
+        if len(order):
+            self._build(coords, order, 0, len(order))
+        self.order = order.tolist()
+
+    def _build(self, coords, order, start, end):
+        node = len(self.nodes)
+        self.nodes.append(None)
+        if end - start <= self.leaf_size:
+            self.nodes[node] = (-1, 0.0, 0, 0, start, end)
+            return node
+        block = coords[order[start:end]]
+        spread = block.max(axis=0) - block.min(axis=0)
+        axis = 0 if spread[0] >= spread[1] else 1
+        mid = (start + end) // 2
+        order[start:end] = order[start:end][np.argpartition(block[:, axis], mid - start)]
+        split = float(coords[order[mid], axis])
+        left = self._build(coords, order, start, mid)
+        right = self._build(coords, order, mid, end)
+        self.nodes[node] = (axis, split, left, right, start, end)
+        return node
+
+    def __len__(self):
+        return len(self.items)
+
+    def _search(self, px, py, k, limit_sq, accept):
+        "Up to k (distance_sq, index) pairs closer than limit_sq, as a max-heap of negated pairs."
+        nodes, order, xs, ys, items = self.nodes, self.order, self.xs, self.ys, self.items
+        found = []
+        worst = limit_sq
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound > worst:
+                continue
+            axis, split, left, right, start, end = nodes[node]
+            if axis < 0:
+                for position in range(start, end):
+                    i = order[position]
+                    dx = xs[i] - px
+                    dy = ys[i] - py
+                    distance_sq = dx * dx + dy * dy
+                    if distance_sq > worst:
+                        continue
+                    if len(found) == k and (distance_sq, i) >= (-found[0][0], -found[0][1]):
+                        continue
+                    if distance_sq >= limit_sq:
+                        continue
+                    if accept is not None and not accept(items[i]):
+                        continue
+                    if len(found) == k:
+                        heapq.heapreplace(found, (-distance_sq, -i))
+                    else:
+                        heapq.heappush(found, (-distance_sq, -i))
+                    if len(found) == k:
+                        worst = -found[0][0]
+                continue
+            diff = (px if axis == 0 else py) - split
+            if diff < 0:
+                stack.append((right, diff * diff))
+                stack.append((left, bound))
+            else:
+                stack.append((left, diff * diff))
+                stack.append((right, bound))
+        return found
+
+    def nearest(self, position, max_distance=None, accept=None):
+        "Closest item (strictly within max_distance if given), or None."
+        if not self.items:
+            return None
+        limit_sq = math.inf if max_distance is None else max_distance * max_distance
+        found = self._search(position.x, position.y, 1, limit_sq, accept)
+        return self.items[-found[0][1]] if found else None
+
+    def k_nearest(self, position, k, max_distance=None, accept=None):
+        "Up to k closest items, nearest first."
+        if not self.items or k <= 0:
+            return []
+        limit_sq = math.inf if max_distance is None else max_distance * max_distance
+        found = self._search(position.x, position.y, k, limit_sq, accept)
+        return [self.items[-i] for _, i in sorted(found, key=lambda pair: (-pair[0], -pair[1]))]
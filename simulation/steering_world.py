@@ -0,0 +1,165 @@
+from collections import namedtuple
+
+import numpy as np
+
+from behaviors.seek import Seek
+from behaviors.flee import Flee
+from behaviors.pursuit import Pursuit
+from behaviors.evade import Evade
+from behaviors.arrival import Arrival
+from behaviors.circuit import Circuit
+from behaviors.oneway import OneWay
+from behaviors.twoway import TwoWay
+from vector import Vector2D
+from simulation.agents import AgentStore
+
+SteeringSnapshot = namedtuple("SteeringSnapshot", "tick behavior agent_pos agent_vel target_pos")
+
+
+# GUI names of the behaviors the controlled agent can run
+BEHAVIOR_CLASSES = {
+    "Seek": Seek, "Flee": Flee, "Pursuit": Pursuit, "Evade": Evade, "Arrival": Arrival,
+    "Circuit": Circuit, "One Way": OneWay, "Two Ways": TwoWay,
+}
+
+# Behavior ids stored per agent. CONTROLLED follows the behavior picked in the
+# GUI; the others are run for the whole crowd through calculate_batch.
+CONTROLLED = 0
+CROWD_BEHAVIORS = {1: Seek(), 2: Flee(), 3: Pursuit(), 4: Evade(), 5: Arrival()}
+CROWD_BEHAVIOR_IDS = {type(b).__name__: i for i, b in CROWD_BEHAVIORS.items()}
+
+
+class SteeringWorld:
+    """Headless state and physics for the Lab01 steering sandbox.
+
+    Every agent lives in an AgentStore. Row 0 is the agent the GUI controls;
+    add_agent() adds crowd agents that chase or avoid the same target.
+    """
+
+    # Methods a FrameProfiler counts when attached
+    PROFILED_COUNTERS = {"get_behavior_instance": "behavior_lookups"}
+
+    def __init__(self, width=800, height=600, dt=0.16):
+        self.width = width
+        self.height = height
+        self.dt = dt
+        self.tick = 0
+
+        self.max_speed = 40 * 0.2
+        self.max_force = 2 * 0.1
+
+        self.agents = AgentStore()
+        self.agent_id = self.agents.add((400, 300), (0, 0), self.max_speed, self.max_force, CONTROLLED)
+        self.target_pos = Vector2D(600, 300)
+        self.target_vel = Vector2D(0, 0)
+
+        self.current_behavior = None
+        self.behavior_instances = {}
+        # Per-world copy so pipelines added with add_agent() get their own ids
+        self.crowd_behaviors = dict(CROWD_BEHAVIORS)
+
+    @property
+    def agent_pos(self):
+        x, y = self.agents.positions[self.agents.row_of(self.agent_id)]
+        return Vector2D(float(x), float(y))
+
+    @agent_pos.setter
+    def agent_pos(self, position):
+        self.agents.positions[self.agents.row_of(self.agent_id)] = (position.x, position.y)
+
+    @property
+    def agent_vel(self):
+        x, y = self.agents.velocities[self.agents.row_of(self.agent_id)]
+        return Vector2D(float(x), float(y))
+
+    @agent_vel.setter
+    def agent_vel(self, velocity):
+        self.agents.velocities[self.agents.row_of(self.agent_id)] = (velocity.x, velocity.y)
+
+    def add_agent(self, position, behavior="Seek", velocity=(0, 0), max_speed=None, max_force=None):
+        """Add a crowd agent and return its id.
+
+        behavior is the name of a batch behavior (Seek, Flee, Pursuit, Evade,
+        Arrival) or any object with calculate_batch, such as a WeightedSum or
+        Prioritized pipeline. Agents sharing one object are evaluated together
+        in a single batch call.
+        """
+        return self.agents.add(
+            position, velocity,
+            self.max_speed if max_speed is None else max_speed,
+            self.max_force if max_force is None else max_force,
+            self.crowd_behavior_id(behavior),
+        )
+
+    def crowd_behavior_id(self, behavior):
+        if isinstance(behavior, str):
+            return CROWD_BEHAVIOR_IDS[behavior]
+        for behavior_id, known in self.crowd_behaviors.items():
+            if known is behavior:
+                return behavior_id
+        behavior_id = max(self.crowd_behaviors) + 1
+        self.crowd_behaviors[behavior_id] = behavior
+        return behavior_id
+
+    def remove_agent(self, agent_id):
+        if agent_id == self.agent_id:
+            raise ValueError("The controlled agent cannot be removed")
+        self.agents.remove(agent_id)
+
+    def set_behavior(self, behavior):
+        self.current_behavior = behavior
+        # Reset agent velocity when changing behaviors
+        self.agent_vel = Vector2D(0, 0)
+        # Reset the behavior instance if it exists
+        if behavior in self.behavior_instances:
+            if hasattr(self.behavior_instances[behavior], 'reset'):
+                self.behavior_instances[behavior].reset()
+
+    def get_behavior_instance(self, behavior_name):
+        if behavior_name not in self.behavior_instances:
+            self.behavior_instances[behavior_name] = BEHAVIOR_CLASSES[behavior_name]()
+        return self.behavior_instances[behavior_name]
+
+    def step(self):
+        "Advance every agent by one tick."
+        self.tick += 1
+        agents = self.agents
+        if not self.current_behavior and len(agents) == 1:
+            return
+
+        steering = np.zeros((len(agents), 2))
+        row = agents.row_of(self.agent_id)
+        agents.max_speed[row] = self.max_speed
+        agents.max_force[row] = self.max_force
+        if self.current_behavior:
+            behavior = self.get_behavior_instance(self.current_behavior)
+            force = behavior.calculate(
+                self.agent_pos, self.agent_vel,
+                self.target_pos, self.target_vel,
+                self.max_speed, self.max_force
+            )
+            steering[row] = (force.x, force.y)
+
+        # Crowd agents: one batch call per behavior id
+        for behavior_id, behavior in self.crowd_behaviors.items():
+            rows = np.flatnonzero(agents.behavior == behavior_id)
+            if len(rows) == 0:
+                continue
+            targets = np.broadcast_to((self.target_pos.x, self.target_pos.y), (len(rows), 2))
+            target_vels = np.broadcast_to((self.target_vel.x, self.target_vel.y), (len(rows), 2))
+            steering[rows] = behavior.calculate_batch(
+                agents.positions[rows], agents.velocities[rows],
+                targets, target_vels,
+                agents.max_speed[rows], agents.max_force[rows]
+            )
+
+        # Apply steering, clamp speed, move and bounce off the edges in one call
+        agents.integrate(steering, self.dt, bounds=(self.width, self.height), edge_mode="bounce")
+
+    def snapshot(self):
+        return SteeringSnapshot(
+            self.tick, self.current_behavior,
+            (self.agent_pos.x, self.agent_pos.y),
+            (self.agent_vel.x, self.agent_vel.y),
+            (self.target_pos.x, self.target_pos.y),
+        )
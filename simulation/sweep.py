@@ -0,0 +1,180 @@
+"""Run many headless rescue episodes across processes.
+
+    python -m simulation.sweep --seeds 0-9 --victims 8 20 --max-speed 2 3 4 --out sweep.jsonl
+
+Every finished episode is appended to the output file as one JSON line as
+soon as it completes, so a long sweep can be watched (or resumed by hand)
+while it runs. The per-setting averages are printed at the end.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from simulation.engine import Engine
+from simulation.mapfile import MapFile
+from simulation.rescue_world import RescueWorld
+
+# Everything that makes up one setting; an episode is a setting plus a seed
+SETTING_KEYS = ("map", "victim_count", "npc_count", "planner", "delivery", "smoothing", "max_speed", "max_force")
+
+
+def run_episode(params):
+    """Run one headless episode and return its parameters and metrics.
+
+    params holds a seed, max_ticks and the SETTING_KEYS; a "map" path runs
+    the episode on that map file instead of the built-in map. The episode
+    ends when every victim is delivered or after max_ticks.
+    """
+    city = MapFile(params["map"]) if params.get("map") else None
+    try:
+        world = RescueWorld(params["victim_count"], planner=params["planner"], npc_count=params["npc_count"],
+                            seed=params["seed"], delivery=params.get("delivery", "path"), city=city,
+                            smoothing=params.get("smoothing", "none"), player=False)
+    finally:
+        if city is not None:
+            # The world copied everything it keeps while setting up; unmap before the episode runs
+            city.close()
+    world.max_speed = params["max_speed"]
+    world.max_force = params["max_force"]
+    spawned = len(world.victims)
+
+    start = time.perf_counter()
+    engine = Engine(world)
+    while world.tick < params["max_ticks"] and not engine.is_finished():
+        engine.step()
+    elapsed = time.perf_counter() - start
+
+    cleared = engine.is_finished()
+    result = dict(params)
+    result.update({
+        "spawned": spawned,
+        "cleared": cleared,
+        "ticks": world.tick,
+        "ticks_to_clear": world.tick if cleared else None,
+        "rescued": world.rescued_count,
+        "npc_rescues": world.npc_rescues,
+        "path_length": sum(npc.distance_travelled for npc in world.npcs),
+        "wall_time": elapsed,
+    })
+    return result
+
+
+def expand_grid(seeds, victim_counts, npc_counts=(1,), planners=("bfs",),
+                max_speeds=(3,), max_forces=(0.5,), max_ticks=20000, deliveries=("path",), map_path=None,
+                smoothings=("none",)):
+    "Every combination of the given values as a list of episode parameter dicts."
+    episodes = []
+    for seed, victim_count, npc_count, planner, delivery, smoothing, max_speed, max_force in itertools.product(
+        seeds, victim_counts, npc_counts, planners, deliveries, smoothings, max_speeds, max_forces
+    ):
+        episodes.append({
+            "seed": seed, "map": map_path, "victim_count": victim_count, "npc_count": npc_count,
+            "planner": planner, "delivery": delivery, "smoothing": smoothing,
+            "max_speed": max_speed, "max_force": max_force, "max_ticks": max_ticks,
+        })
+    return episodes
+
+
+def run_sweep(episodes, out_path, workers=None):
+    """Run the episodes on a process pool, appending each result to out_path as a JSON line.
+
+    Yields results in completion order. workers=1 runs in this process.
+    """
+    with open(out_path, "a") as out:
+        if workers == 1:
+            for result in map(run_episode, episodes):
+                _append(out, result)
+                yield result
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_episode, params) for params in episodes]
+            for future in as_completed(futures):
+                result = future.result()
+                _append(out, result)
+                yield result
+
+
+def _append(out, result):
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+def aggregate(results):
+    "Average the metrics of all seeds for each setting; returns a list of dicts."
+    groups = {}
+    for result in results:
+        groups.setdefault(tuple(result[key] for key in SETTING_KEYS), []).append(result)
+    rows = []
+    for setting, group in sorted(groups.items(), key=lambda item: tuple(str(v) for v in item[0])):
+        cleared = [r["ticks_to_clear"] for r in group if r["cleared"]]
+        row = dict(zip(SETTING_KEYS, setting))
+        row.update({
+            "episodes": len(group),
+            "clear_rate": len(cleared) / len(group),
+            "mean_ticks_to_clear": sum(cleared) / len(cleared) if cleared else None,
+            "mean_rescued": sum(r["rescued"] for r in group) / len(group),
+            "mean_npc_rescues": sum(r["npc_rescues"] for r in group) / len(group),
+            "mean_path_length": sum(r["path_length"] for r in group) / len(group),
+        })
+        rows.append(row)
+    return rows
+
+
+def parse_seeds(text):
+    "'7' -> [7], '0-9' -> [0..9], '1,5,9' -> [1, 5, 9]"
+    seeds = []
+    for part in text.split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            seeds.extend(range(int(low), int(high) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulation.sweep", description="Headless rescue parameter sweep")
+    parser.add_argument("--seeds", type=parse_seeds, default=parse_seeds("0-3"), help="e.g. 0-9 or 1,4,7")
+    parser.add_argument("--victims", type=int, nargs="+", default=[8])
+    parser.add_argument("--npcs", type=int, nargs="+", default=[1])
+    parser.add_argument("--planner", nargs="+", choices=RescueWorld.PLANNERS, default=["bfs"])
+    parser.add_argument("--delivery", nargs="+", choices=RescueWorld.DELIVERY_MODES, default=["path"])
+    parser.add_argument("--smoothing", nargs="+", choices=RescueWorld.SMOOTHING_MODES, default=["none"])
+    parser.add_argument("--max-speed", type=float, nargs="+", default=[3])
+    parser.add_argument("--max-force", type=float, nargs="+", default=[0.5])
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    parser.add_argument("--map", help="run on this map file (python -m simulation.mapfile) instead of the built-in map")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: every core)")
+    parser.add_argument("--out", default="sweep.jsonl", help="per-episode results, one JSON line each")
+    parser.add_argument("--summary", help="also write the per-setting averages as JSON")
+    args = parser.parse_args(argv)
+
+    episodes = expand_grid(args.seeds, args.victims, args.npcs, args.planner,
+                           args.max_speed, args.max_force, args.max_ticks, args.delivery, args.map, args.smoothing)
+    print(f"Running {len(episodes)} episodes on {args.workers or os.cpu_count()} workers -> {args.out}")
+    results = []
+    for done, result in enumerate(run_sweep(episodes, args.out, args.workers), 1):
+        results.append(result)
+        print(f"[{done}/{len(episodes)}] seed={result['seed']} victims={result['victim_count']} "
+              f"npcs={result['npc_count']} ticks={result['ticks']} rescued={result['rescued']}/{result['spawned']}")
+
+    rows = aggregate(results)
+    for row in rows:
+        ticks = row["mean_ticks_to_clear"]
+        print(f"victims={row['victim_count']} npcs={row['npc_count']} planner={row['planner']} delivery={row['delivery']} "
+              f"smoothing={row['smoothing']} "
+              f"speed={row['max_speed']} force={row['max_force']}: clear {row['clear_rate']:.0%}, "
+              f"ticks {'-' if ticks is None else f'{ticks:.0f}'}, rescued {row['mean_rescued']:.1f}, "
+              f"path {row['mean_path_length']:.0f}")
+    if args.summary:
+        with open(args.summary, "w") as handle:
+            json.dump(rows, handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+from simulation.spatial import SpatialHash
+
+
+class VictimStore:
+    """Victims waiting for pickup, keyed by stable integer ids.
+
+    Ids are handed out in spawn order and never reused (not even after
+    clear()), so claims and targets can name a victim without comparing
+    float positions. The store is a mapping id -> Vector2D: adding,
+    removing and looking up a victim are O(1) dict operations, and
+    iteration follows spawn order. A SpatialHash over the same ids answers
+    proximity queries.
+    """
+
+    def __init__(self, cell_size=50):
+        self.positions = {}
+        self.index = SpatialHash(cell_size)
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, victim_id):
+        return victim_id in self.positions
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __getitem__(self, victim_id):
+        return self.positions[victim_id]
+
+    def items(self):
+        return self.positions.items()
+
+    def values(self):
+        return self.positions.values()
+
+    def clear(self):
+        self.positions = {}
+        self.index.clear()
+
+    def add(self, position):
+        "Store a victim at position and return its new id."
+        victim_id = self.next_id
+        self.next_id += 1
+        self.positions[victim_id] = position
+        self.index.insert(victim_id, position)
+        return victim_id
+
+    def remove(self, victim_id):
+        "Remove a victim and return its position."
+        position = self.positions.pop(victim_id)
+        self.index.remove(victim_id)
+        return position
+
+    def nearest(self, position, max_distance=None):
+        "Id of the closest victim (within max_distance if given), or None."
+        return self.index.nearest(position, max_distance=max_distance)
+
+    def any_within(self, position, radius):
+        return self.index.any_within(position, radius)
@@ -0,0 +1,47 @@
+import numpy as np
+
+from behaviors.pipeline import Prioritized, WeightedSum
+from behaviors.seek import Seek
+from behaviors.separation import Separation
+from simulation.steering_world import SteeringWorld
+from vector import Vector2D
+
+
+def crowd_spread(pipeline, positions, ticks=50):
+    world = SteeringWorld()
+    ids = [world.add_agent(position, pipeline) for position in positions]
+    start = np.array(positions, dtype=float)
+    for _ in range(ticks):
+        world.step()
+    rows = [world.agents.row_of(agent_id) for agent_id in ids]
+    return start, world.agents.positions[rows]
+
+
+def test_pipelined_crowd_spreads_apart():
+    start, end = crowd_spread(WeightedSum((Separation(30), 1.0)), [(400, 300), (402, 300)])
+    assert end[1, 0] - end[0, 0] > start[1, 0] - start[0, 0]
+
+
+def test_seek_and_separate_crowd_keeps_apart():
+    pipeline = WeightedSum((Seek(), 1.0), (Separation(30), 2.0))
+    start, end = crowd_spread(pipeline, [(100, 300), (100, 302), (100, 304)], ticks=5)
+    spread = end[:, 1].max() - end[:, 1].min()
+    assert spread > start[:, 1].max() - start[:, 1].min()
+
+
+def test_prioritized_crowd_separates():
+    start, end = crowd_spread(Prioritized((Separation(30), 1.0), (Seek(), 1.0)), [(400, 300), (400, 301)])
+    assert end[1, 1] - end[0, 1] > start[1, 1] - start[0, 1]
+
+
+def test_batch_with_neighbors_matches_scalar():
+    rng = np.random.default_rng(0)
+    neighbors = [Vector2D(*point) for point in rng.uniform(0, 60, (6, 2))]
+    separation = Separation(30, neighbors)
+    positions = rng.uniform(0, 60, (20, 2))
+    velocities = rng.uniform(-1, 1, (20, 2))
+    forces = separation.calculate_batch(positions, velocities, positions, velocities, 8.0, 0.2, others=neighbors)
+    for row in range(len(positions)):
+        force = separation.calculate(Vector2D(*positions[row]), Vector2D(*velocities[row]),
+                                     Vector2D(0, 0), Vector2D(0, 0), 8.0, 0.2)
+        assert np.allclose(forces[row], (force.x, force.y))
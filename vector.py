@@ -2,6 +2,15 @@
 import math
 
 class Vector2D:
+    """2D vector shared by the behaviors and both simulations.
+
+    The operators (+, -, *, /) return new vectors. The in-place forms
+    (+=, -=, *=, normalize_ip, clamp_length_ip) reuse this object and are
+    meant for hot loops. Vectors compare and hash by value, so never mutate
+    one that is used as a dict key (waypoints, victims).
+    """
+    __slots__ = ("x", "y")
+
     def __init__(self, x=0, y=0):
         self.x = x
         self.y = y
@@ -11,35 +20,102 @@ class Vector2D:
         rad = math.radians(angle)
         cos_a = math.cos(rad)
         sin_a = math.sin(rad)
-        print("trying to rotate")
         new_x = self.x * cos_a - self.y * sin_a
         new_y = self.x * sin_a + self.y * cos_a
         self.x, self.y = new_x, new_y  # Update in place
 
+    def copy(self):
+        return Vector2D(self.x, self.y)
+
+    def set(self, x, y):
+        self.x = x
+        self.y = y
+        return self
 
-    
     def __add__(self, other):
         return Vector2D(self.x + other.x, self.y + other.y)
-    
+
     def __sub__(self, other):
         return Vector2D(self.x - other.x, self.y - other.y)
-    
+
     def __mul__(self, scalar):
         return Vector2D(self.x * scalar, self.y * scalar)
-    
+
     def __truediv__(self, scalar):
         if scalar != 0:
             return Vector2D(self.x / scalar, self.y / scalar)
         return Vector2D()
-    
+
+    def __iadd__(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, scalar):
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, Vector2D):
+            return self.x == other.x and self.y == other.y
+        return False
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __repr__(self):
+        return f"Vector2D({self.x}, {self.y})"
+
     def length(self):
         return math.sqrt(self.x * self.x + self.y * self.y)
-    
+
+    def length_squared(self):
+        return self.x * self.x + self.y * self.y
+
     def distance_to(self, other):
-        return (other - self).length()
-    
+        dx = other.x - self.x
+        dy = other.y - self.y
+        return math.sqrt(dx * dx + dy * dy)
+
+    def distance_squared_to(self, other):
+        dx = other.x - self.x
+        dy = other.y - self.y
+        return dx * dx + dy * dy
+
     def normalized(self):
         length = self.length()
         if length != 0:
             return self / length
-        return Vector2D()
\ No newline at end of file
+        return Vector2D()
+
+    def normalize_ip(self):
+        """Normalize in place; a zero vector stays zero."""
+        length = self.length()
+        if length != 0:
+            self.x = self.x / length
+            self.y = self.y / length
+        else:
+            self.x = 0
+            self.y = 0
+        return self
+
+    def clamp_length_ip(self, max_length):
+        """Scale down in place to max_length if longer; compares squared lengths."""
+        length_sq = self.x * self.x + self.y * self.y
+        if length_sq > max_length * max_length:
+            length = math.sqrt(length_sq)
+            self.x = self.x / length * max_length
+            self.y = self.y / length * max_length
+        return self
+
+    def dot(self, other):
+        return self.x * other.x + self.y * other.y
+
+    def cross(self, other):
+        return self.x * other.y - self.y * other.x